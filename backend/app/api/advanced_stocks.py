@@ -6,6 +6,7 @@ Handles insider trading, options, and advanced analytics using RapidAPI
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from pydantic import BaseModel, Field
+import asyncio
 import logging
 import datetime
 
@@ -75,12 +76,16 @@ class StockStatistics(BaseModel):
 
 
 @router.get("/insider-trades")
-async def get_insider_trades(symbol: Optional[str] = None):
+async def get_insider_trades(
+    symbol: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of trades to return")
+):
     """
     Get insider trading information
     
     Args:
         symbol: Optional stock symbol to filter by
+        limit: Optional cap on the number of trades returned
     
     Returns:
         List of insider trades from real API data
@@ -93,6 +98,8 @@ async def get_insider_trades(symbol: Optional[str] = None):
         # If API returns data, use it
         if trades:
             logger.info(f"✅ SUCCESS: Retrieved {len(trades)} real insider trades from RapidAPI")
+            # Previews only need the first few trades; skip tagging the rest
+            trades = trades[:limit]
             # Add metadata to indicate this is real data
             for trade in trades:
                 trade["data_source"] = "RapidAPI_Yahoo_Finance"
@@ -188,7 +195,7 @@ async def get_insider_trades(symbol: Optional[str] = None):
         }
     ]
     
-    return mock_trades
+    return mock_trades[:limit]
 
 
 @router.get("/trending")
@@ -209,23 +216,19 @@ async def get_trending_stocks():
         # Get quotes for popular stocks to determine trending
         popular_symbols = ["NVDA", "TSLA", "AAPL", "AMD", "META", "GOOGL", "MSFT", "AMZN"]
         
-        for symbol in popular_symbols:
-            try:
-                quote = await yahoo_finance_rapid_service.get_quote(symbol)
-                if quote and quote.get("current_price", 0) > 0:
-                    trending_stocks.append({
-                        "symbol": symbol,
-                        "name": quote.get("company_name", symbol),
-                        "price": quote.get("current_price", 0),
-                        "change": quote.get("price_change", 0),
-                        "change_percent": quote.get("price_change_percent", 0),
-                        "volume": quote.get("volume", 0),
-                        "market_cap": quote.get("market_cap", 0),
-                        "social_sentiment": 50 + (quote.get("price_change_percent", 0) * 2)  # Simple sentiment calculation
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch quote for {symbol}: {e}")
-                continue
+        quotes = await yahoo_finance_rapid_service.get_quotes_batch(popular_symbols)
+        for symbol, quote in quotes.items():
+            if quote and quote.get("current_price", 0) > 0:
+                trending_stocks.append({
+                    "symbol": symbol,
+                    "name": quote.get("company_name", symbol),
+                    "price": quote.get("current_price", 0),
+                    "change": quote.get("price_change", 0),
+                    "change_percent": quote.get("price_change_percent", 0),
+                    "volume": quote.get("volume", 0),
+                    "market_cap": quote.get("market_cap", 0),
+                    "social_sentiment": 50 + (quote.get("price_change_percent", 0) * 2)  # Simple sentiment calculation
+                })
         
         # If we got real data, return it
         if trending_stocks:
@@ -353,7 +356,7 @@ async def get_market_summary():
         
         try:
             # Use our specialized market indices method with rate limiting
-            results = yahoo_finance_service.get_market_indices_batch()
+            results = await yahoo_finance_service.aget_market_indices_batch()
         except Exception as e:
             logger.error(f"Error fetching market indices via rate-limited service: {e}")
             results = []
@@ -452,8 +455,10 @@ async def analyze_stock_risk(symbol: str):
         symbol = symbol.upper()
         
         # Get comprehensive data
-        quote = await yahoo_finance_rapid_service.get_quote(symbol)
-        stats = await yahoo_finance_rapid_service.get_stock_statistics(symbol)
+        quote, stats = await asyncio.gather(
+            yahoo_finance_rapid_service.get_quote(symbol),
+            yahoo_finance_rapid_service.get_stock_statistics(symbol)
+        )
         
         # Calculate risk metrics
         beta = quote.get("beta", 1.0)
@@ -109,7 +109,7 @@ async def get_news_api_status():
     return {
         "api_key_configured": bool(news_monitor.api_key and news_monitor.api_key not in ["", "demo_mock_mode", "your_news_api_key_here"]),
         "api_key_preview": news_monitor.api_key[:10] + "..." if news_monitor.api_key and len(news_monitor.api_key) > 10 else news_monitor.api_key,
-        "newsapi_client_initialized": news_monitor.newsapi is not None,
-        "using_mock_data": news_monitor.newsapi is None,
+        "newsapi_client_initialized": news_monitor.live_mode,
+        "using_mock_data": not news_monitor.live_mode,
         "cache_entries": len(news_monitor.cache)
     } 
\ No newline at end of file
@@ -3,7 +3,7 @@ Stock Market API Endpoints
 Handles stock data fetching and monitoring operations
 """
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Response
 from typing import List, Optional
 from pydantic import BaseModel, Field
 import yfinance as yf
@@ -11,11 +11,19 @@ from datetime import datetime
 import logging
 import requests
 
+from app.core.config import settings
 from app.services.yahoo_finance import yahoo_finance_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Served when the index feed returns nothing usable; timestamped per response
+_FALLBACK_INDEX_PRICES = (
+    {"symbol": "^GSPC", "name": "S&P 500", "price": 4450.38, "change": -12.32, "change_percent": -0.28},
+    {"symbol": "^DJI", "name": "Dow Jones", "price": 34521.45, "change": -156.78, "change_percent": -0.45},
+    {"symbol": "^IXIC", "name": "NASDAQ", "price": 13908.23, "change": 45.67, "change_percent": 0.33}
+)
+
 # Pydantic models for request/response
 class StockInfo(BaseModel):
     symbol: str
@@ -180,7 +188,7 @@ async def get_user_stocks(symbols: str = Query(..., description="Comma-separated
         symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
         
         # Use the new batch method with rate limiting and caching
-        stock_data_list = yahoo_finance_service.get_multiple_stocks_batch(symbol_list)
+        stock_data_list = await yahoo_finance_service.aget_multiple_stocks(symbol_list)
         
         # Convert to UserStock objects
         results = []
@@ -286,34 +294,11 @@ async def get_stock_history(
     """
     try:
         symbol = symbol.upper()
-        history_result = yahoo_finance_service.get_stock_history(symbol, period, interval)
-        
-        # Handle the returned dictionary structure
-        if history_result and 'data' in history_result:
-            history_data = history_result['data']
-            
-            # Convert the data to match HistoricalData model
-            formatted_data = []
-            for item in history_data:
-                formatted_item = {
-                    "date": item.get("Date", item.get("date", "")),
-                    "open": float(item.get("Open", item.get("open", 0))),
-                    "high": float(item.get("High", item.get("high", 0))),
-                    "low": float(item.get("Low", item.get("low", 0))),
-                    "close": float(item.get("Close", item.get("close", 0))),
-                    "volume": int(item.get("Volume", item.get("volume", 0)))
-                }
-                formatted_data.append(HistoricalData(**formatted_item))
+        # Serialized column-wise in the HistoricalData shape, skipping per-row models;
+        # failed fetches fall back to mock history rather than raising
+        content = yahoo_finance_service.get_stock_history_json(symbol, period, interval)
+        return Response(content=content, media_type="application/json")
             
-            return formatted_data
-        else:
-            # Return empty list if no data
-            logger.warning(f"No historical data returned for {symbol}")
-            return []
-            
-    except ValueError as e:
-        logger.error(f"ValueError getting history for {symbol}: {str(e)}")
-        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting history for {symbol}: {str(e)}")
         # Return empty list instead of 500 error
@@ -411,6 +396,19 @@ async def get_cached_price(symbol: str):
     return data
 
 
+# Cache statistics are unauthenticated, so only expose them in development
+if settings.ENVIRONMENT == "development":
+    @router.get("/debug/cache")
+    async def get_cache_stats():
+        """
+        Get sizes and hit rates of the stock data caches
+        
+        Returns:
+            Cache statistics for the Yahoo Finance service and its fallback
+        """
+        return yahoo_finance_service.get_cache_stats()
+
+
 @router.get("/index-prices")
 async def get_index_prices():
     """
@@ -421,28 +419,16 @@ async def get_index_prices():
     """
     try:
         # Use our specialized market indices method with rate limiting and caching
-        results = yahoo_finance_service.get_market_indices_batch()
+        results = await yahoo_finance_service.aget_market_indices_batch()
         
         # If no data, return fallback
         if not results or all(r["price"] == 0 for r in results):
-            fallback_data = [
-                {"symbol": "^GSPC", "name": "S&P 500", "price": 4450.38, "change": -12.32, "change_percent": -0.28},
-                {"symbol": "^DJI", "name": "Dow Jones", "price": 34521.45, "change": -156.78, "change_percent": -0.45},
-                {"symbol": "^IXIC", "name": "NASDAQ", "price": 13908.23, "change": 45.67, "change_percent": 0.33}
-            ]
-            for data in fallback_data:
-                data["timestamp"] = datetime.now().isoformat()
-            return fallback_data
+            timestamp = datetime.now().isoformat()
+            return [{**data, "timestamp": timestamp} for data in _FALLBACK_INDEX_PRICES]
         
         return results
     except Exception as e:
         logger.error(f"Error in get_index_prices: {str(e)}")
         # Return fallback data on error
-        fallback_data = [
-            {"symbol": "^GSPC", "name": "S&P 500", "price": 4450.38, "change": -12.32, "change_percent": -0.28},
-            {"symbol": "^DJI", "name": "Dow Jones", "price": 34521.45, "change": -156.78, "change_percent": -0.45},
-            {"symbol": "^IXIC", "name": "NASDAQ", "price": 13908.23, "change": 45.67, "change_percent": 0.33}
-        ]
-        for data in fallback_data:
-            data["timestamp"] = datetime.now().isoformat()
-        return fallback_data 
\ No newline at end of file
+        timestamp = datetime.now().isoformat()
+        return [{**data, "timestamp": timestamp} for data in _FALLBACK_INDEX_PRICES] 
\ No newline at end of file
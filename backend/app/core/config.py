@@ -73,6 +73,8 @@ class Settings(BaseSettings):
     
     # Cache Configuration
     CACHE_TTL: int = 300  # seconds
+    REDIS_URL: str = ""  # Shared cache for multi-worker deployments; in-process only when empty
+    YAHOO_CACHE_DIR: str = "/tmp/yf_cache"  # diskcache directory for Yahoo quotes and history
     
     # Environment-specific configurations
     ENVIRONMENT: str = "development"
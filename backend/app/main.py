@@ -9,6 +9,7 @@ if str(backend_dir) not in sys.path:
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 import asyncio
@@ -59,6 +60,9 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress larger JSON payloads (news, history, options chains) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
 app.include_router(monitoring.router, prefix="/api/v1/monitoring", tags=["monitoring"])
@@ -117,6 +121,11 @@ async def shutdown_event():
     await session_service.disconnect()
     print("Session service disconnected")
     
+    # Close News API client
+    from app.services.news_monitor import news_monitor
+    await news_monitor.close()
+    print("News API client closed")
+    
     # Save Yahoo Finance cache
     from app.services.yahoo_finance import yahoo_finance_service
     yahoo_finance_service.cleanup()
@@ -214,10 +223,19 @@ if __name__ == "__main__":
     print(f"🔧 Starting from directory: {backend_dir}")
     print(f"🐍 Python path includes: {backend_dir}")
     
+    # Auto-reload (file watcher + supervisor process) only when asked for
+    reload = os.getenv("DEV_RELOAD") == "1"
+    # Watch only the app package (uvicorn[standard] ships the watchfiles watcher),
+    # skipping bytecode, data and log files the server writes itself
+    reload_options = {
+        "reload": True,
+        "reload_dirs": [str(backend_dir / "app")],
+        "reload_excludes": ["*/__pycache__/*", "*/data/*", "*.log"]
+    } if reload else {}
+    
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        reload_dirs=[str(backend_dir)]
+        **reload_options
     ) 
\ No newline at end of file
@@ -2,10 +2,14 @@
 LLM-related data models and enums
 """
 from enum import Enum
-from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field
+from collections import deque
+from typing import Dict, Any, Optional, List, Deque
+from pydantic import BaseModel, Field, field_validator, field_serializer
 from datetime import datetime
 
+# Conversation turns kept per session
+MAX_CONTEXT_TURNS = 10
+
 class LLMErrorEnum(Enum):
     """LLM error types for granular handling"""
     RATE_LIMIT = "rate_limit"
@@ -22,11 +26,22 @@ class SessionState(BaseModel):
     risk_level: Optional[str] = "medium"  # low, medium, high
     last_crypto_pct: Optional[float] = None
     last_stock_pct: Optional[float] = None
-    conversation_context: List[Dict[str, str]] = Field(default_factory=list)
+    conversation_context: Deque[Dict[str, str]] = Field(default_factory=lambda: deque(maxlen=MAX_CONTEXT_TURNS))
     hsbc_products_mentioned: List[str] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
+    @field_validator('conversation_context', mode='after')
+    @classmethod
+    def bound_context(cls, context):
+        """Keep only the most recent turns, trimming on append"""
+        return deque(context, maxlen=MAX_CONTEXT_TURNS)
+    
+    @field_serializer('conversation_context')
+    def serialize_context(self, context):
+        """Serialize turns as a plain list"""
+        return list(context)
+    
     def update_allocation(self, asset_type: str, percentage: float):
         """Update allocation percentages"""
         if asset_type == "crypto":
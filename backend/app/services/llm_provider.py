@@ -250,7 +250,7 @@ class GeminiProvider(BaseLLMProvider):
             context = {
                 "query": prompt,
                 "risk_profile": session_state.risk_level if session_state else "medium",
-                "session_context": str(session_state.conversation_context[-3:]) if session_state else "",
+                "session_context": str(list(session_state.conversation_context)[-3:]) if session_state else "",
                 "hsbc_product": hsbc_product,
                 "crypto_allocation": session_state.last_crypto_pct or self._get_default_allocation("crypto", session_state.risk_level if session_state else "medium"),
                 "stock_allocation": session_state.last_stock_pct or self._get_default_allocation("stocks", session_state.risk_level if session_state else "medium"),
@@ -2,19 +2,108 @@
 News monitoring service using NewsAPI
 """
 import asyncio
+import re
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Set
-# NewsAPI imports moved to __init__ method to handle missing dependency gracefully
+from typing import List, Dict, Optional, Set, Tuple
 import logging
-from dataclasses import dataclass
-from collections import defaultdict
+from dataclasses import dataclass, field
+from collections import defaultdict, Counter
+from functools import lru_cache
+from bisect import bisect_right
+
+import httpx
+import orjson
+import redis.asyncio as aioredis
+from cachetools import LRUCache, TTLCache
 
 from ..core.config import settings
 
+try:
+    import re2 as _symbol_re_engine  # Linear-time automaton matching via google-re2
+except ImportError:
+    _symbol_re_engine = re
+
 logger = logging.getLogger(__name__)
 
+NEWS_API_BASE_URL = "https://newsapi.org/v2"
+
+# BM25 term-frequency saturation for keyword relevance scoring; lengths are
+# normalized against a fixed typical title + description length, so an
+# article's score never depends on what else has been scored
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_ARTICLE_WORDS = 40
+
+# Relevance above which a symbol's article raises an alert (high relevance)
+ALERT_RELEVANCE_THRESHOLD = 0.7
+
+# Stock symbols in article text (e.g., $AAPL, AAPL)
+_SYMBOL_RE = _symbol_re_engine.compile(r'\$[A-Z]{1,5}\b|(?:^|\s)([A-Z]{2,5})(?:\s|$|[,.])')
+
+# Common stock symbols to recognize
+_COMMON_SYMBOLS = frozenset({
+    'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'META', 'TSLA', 'NVDA', 
+    'BRK', 'V', 'JNJ', 'WMT', 'JPM', 'PG', 'MA', 'UNH', 'HD', 'DIS',
+    'BAC', 'XOM', 'ABBV', 'CVX', 'PFE', 'CSCO', 'TMO', 'COST', 'PEP',
+    'AVGO', 'KO', 'MRK', 'LLY', 'ACN', 'NKE', 'ADBE', 'NFLX', 'ABT',
+    'AMD', 'INTC', 'WFC', 'CRM', 'ORCL', 'MDT', 'UPS', 'TXN', 'MS',
+    'BA', 'BMY', 'RTX', 'NOW', 'QCOM', 'CVS', 'GS', 'HON', 'SCHW',
+    'SPY', 'QQQ', 'DIA', 'IWM', 'VTI', 'VOO',  # Popular ETFs
+    'GM', 'F', 'UBER', 'LYFT', 'ABNB', 'COIN', 'HOOD', 'PLTR', 'SOFI'
+})
+
+# Company names mapped to symbols
+_COMPANY_MAPPINGS: Dict[str, str] = {
+    'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL', 'alphabet': 'GOOGL',
+    'amazon': 'AMZN', 'meta': 'META', 'facebook': 'META', 'tesla': 'TSLA',
+    'nvidia': 'NVDA', 'berkshire': 'BRK', 'visa': 'V', 'johnson': 'JNJ',
+    'walmart': 'WMT', 'jpmorgan': 'JPM', 'jp morgan': 'JPM', 'disney': 'DIS',
+    'netflix': 'NFLX', 'adobe': 'ADBE', 'salesforce': 'CRM', 'oracle': 'ORCL',
+    'intel': 'INTC', 'amd': 'AMD', 'ford': 'F', 'general motors': 'GM',
+    'gm': 'GM', 'uber': 'UBER', 'coinbase': 'COIN', 'robinhood': 'HOOD',
+    'figma': 'FIGM', 'santander': 'SAN', 'costco': 'COST', 'lululemon': 'LULU',
+    'constellation': 'STZ', 'blackrock': 'BLK'
+}
+
+# Default news keywords per monitored symbol
+_COMPANY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "AAPL": ("Apple", "iPhone", "Tim Cook", "iOS"),
+    "TSLA": ("Tesla", "Elon Musk", "EV", "electric vehicle"),
+    "MSFT": ("Microsoft", "Windows", "Azure", "Satya Nadella"),
+    "GOOGL": ("Google", "Alphabet", "Android", "Sundar Pichai"),
+    "AMZN": ("Amazon", "AWS", "Jeff Bezos", "Andy Jassy"),
+    "META": ("Meta", "Facebook", "Instagram", "Mark Zuckerberg"),
+    "NVDA": ("Nvidia", "GPU", "AI chips", "Jensen Huang"),
+    "BTC": ("Bitcoin", "cryptocurrency", "crypto", "blockchain"),
+    "ETH": ("Ethereum", "crypto", "DeFi", "smart contracts")
+}
+
+# Single-pass matcher over all company names (longest names first); ASCII-only
+# case folding so every match lowercases back to a _COMPANY_MAPPINGS key
+_COMPANY_RE = re.compile("|".join(
+    re.escape(name) for name in sorted(_COMPANY_MAPPINGS, key=len, reverse=True)
+), re.ASCII | re.IGNORECASE)
+
+# Separator between article texts when scanning a batch in one buffer
+_BATCH_SEPARATOR = "\n\x1e\n"
 
-@dataclass
+# Quoted terms of an OR-joined search query (e.g. '"AAPL" OR "Apple"')
+_QUERY_TERM_RE = re.compile(r'"([^"]+)"')
+
+
+@lru_cache(maxsize=256)
+def _query_terms(query: str) -> Tuple[str, ...]:
+    """Lowercased terms an article must mention to match the query"""
+    terms = _QUERY_TERM_RE.findall(query)
+    return tuple(term.lower() for term in terms) if terms else (query.lower(),)
+
+
+class NewsAPIException(Exception):
+    """Error status returned by NewsAPI"""
+
+
+@dataclass(slots=True)
 class NewsArticle:
     """News article data structure"""
     title: str
@@ -25,6 +114,10 @@ class NewsArticle:
     sentiment: Optional[str] = None
     relevance_score: float = 0.0
     symbols: List[str] = None
+    _published_iso: Optional[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._published_iso = self.published_at.isoformat() if self.published_at else None
 
     def to_dict(self) -> Dict:
         return {
@@ -32,56 +125,147 @@ class NewsArticle:
             "description": self.description,
             "source": self.source,
             "url": self.url,
-            "published_at": self.published_at.isoformat() if self.published_at else None,
+            "published_at": self._published_iso,
             "sentiment": self.sentiment,
             "relevance_score": self.relevance_score,
             "symbols": self.symbols or []
         }
 
 
+
+@dataclass(slots=True)
+class NewsAlert:
+    """High-relevance news alert for a monitored symbol"""
+    symbol: str
+    article: NewsArticle
+    fallback_timestamp: str
+
+    def to_dict(self) -> Dict:
+        article = self.article
+        return {
+            "type": "major_news",
+            "severity": "high" if article.relevance_score > 0.85 else "medium",
+            "title": f"Breaking: {self.symbol} - {article.title[:50]}...",
+            "message": article.description[:200] if article.description else article.title,
+            "timestamp": article._published_iso or self.fallback_timestamp,
+            "source": article.source,
+            "url": article.url,
+            "symbol": self.symbol,
+            "metadata": {
+                "relevance_score": article.relevance_score,
+                "full_title": article.title
+            }
+        }
+
+
 class NewsMonitor:
     """Monitor news for financial market events"""
     
     def __init__(self):
         self.api_key = settings.NEWS_API_KEY
-        self.newsapi = None
-        self.cache = {}  # Cache for recent news
+        self.live_mode = False
+        self._client: Optional[httpx.AsyncClient] = None
         self.cache_duration = timedelta(minutes=15)  # Cache for 15 minutes
+        self.cache = TTLCache(maxsize=512, ttl=self.cache_duration.total_seconds())  # Cache for recent news
+        # Symbols found per article text (title + description)
+        self._symbol_memo: LRUCache = LRUCache(maxsize=4096)
+        self._redis = aioredis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None  # Shared cache across workers
         self.monitored_symbols: Set[str] = set()
         self.keyword_alerts: Dict[str, List[str]] = defaultdict(list)  # keyword -> symbols mapping
+        self._symbol_to_keywords: Dict[str, List[str]] = {}  # symbol -> keywords (inverse of keyword_alerts)
+        self._keyword_re: Optional[re.Pattern] = None  # Matcher over keyword_alerts keys, rebuilt lazily
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache_key -> pending NewsAPI search
         
         # Check if we have a real API key (not demo/placeholder values)
         if (self.api_key and 
             self.api_key not in ["demo_mock_mode", "your_news_api_key_here", "", None]):
+            logger.info(f"📰 News service initialized with real API key: {self.api_key[:10]}...")
+            
+            # Test the API with a simple call
             try:
-                # Try to import and initialize NewsApiClient
-                from newsapi import NewsApiClient
-                self.newsapi = NewsApiClient(api_key=self.api_key)
-                logger.info(f"📰 News service initialized with real API key: {self.api_key[:10]}...")
-                
-                # Test the API with a simple call
-                try:
-                    test_response = self.newsapi.get_top_headlines(category='business', page_size=1)
-                    if test_response.get('status') == 'ok':
-                        logger.info("📰 News API test call successful")
-                    else:
-                        logger.error(f"📰 News API test failed: {test_response}")
-                        self.newsapi = None
-                except Exception as test_e:
-                    logger.error(f"📰 News API test call failed: {test_e}")
-                    self.newsapi = None
-                    
-            except ImportError as e:
-                logger.error(f"📰 Failed to import newsapi library: {e}")
-                logger.info("📰 Install with: pip install newsapi-python")
-                self.newsapi = None
-            except Exception as e:
-                logger.error(f"📰 Failed to initialize News API: {e}")
+                test_response = httpx.get(
+                    f"{NEWS_API_BASE_URL}/top-headlines",
+                    params={"category": "business", "pageSize": 1},
+                    headers={"X-Api-Key": self.api_key},
+                    timeout=10.0
+                ).json()
+                if test_response.get('status') == 'ok':
+                    logger.info("📰 News API test call successful")
+                    self.live_mode = True
+                else:
+                    logger.error(f"📰 News API test failed: {test_response}")
+            except Exception as test_e:
+                logger.error(f"📰 News API test call failed: {test_e}")
                 logger.info("📰 Falling back to mock mode")
-                self.newsapi = None
         else:
             logger.info(f"📰 News service running in mock mode - API key: '{self.api_key}'")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get or create the shared keep-alive HTTP client"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=NEWS_API_BASE_URL,
+                headers={"X-Api-Key": self.api_key},
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0)
+            )
+        return self._client
+    
+    async def close(self):
+        """Close HTTP and Redis clients"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        if self._redis:
+            await self._redis.close()
+    
+    async def _get_cached(self, cache_key: str) -> Optional[List[NewsArticle]]:
+        """Get cached articles from the local cache, then the shared Redis cache"""
+        articles = self.cache.get(cache_key)
+        if articles is not None or not self._redis:
+            return articles
+        
+        try:
+            payload = await self._redis.get(cache_key)
+            if payload is None:
+                return None
+            
+            articles = []
+            for data in orjson.loads(payload):
+                if data['published_at']:
+                    data['published_at'] = datetime.fromisoformat(data['published_at'])
+                articles.append(NewsArticle(**data))
+        except Exception as e:
+            logger.warning(f"Redis news cache read failed: {e}")
+            return None
+        
+        self.cache[cache_key] = articles
+        return articles
+    
+    async def _set_cached(self, cache_key: str, articles: List[NewsArticle]):
+        """Store articles in the local cache and the shared Redis cache"""
+        self.cache[cache_key] = articles
+        if not self._redis:
+            return
+        
+        try:
+            await self._redis.set(
+                cache_key,
+                orjson.dumps([article.to_dict() for article in articles]),
+                ex=int(self.cache_duration.total_seconds())
+            )
+        except Exception as e:
+            logger.warning(f"Redis news cache write failed: {e}")
+    
+    async def _request(self, endpoint: str, params: Dict) -> Dict:
+        """Call a NewsAPI endpoint and return the decoded response"""
+        response = await self.client.get(endpoint, params=params)
+        data = orjson.loads(response.content)
+        if data.get('status') != 'ok':
+            raise NewsAPIException(f"{data.get('code', response.status_code)}: {data.get('message', 'unknown error')}")
+        return data
+    
     def add_symbol_monitoring(self, symbol: str, keywords: Optional[List[str]] = None):
         """Add a symbol to monitor for news"""
         self.monitored_symbols.add(symbol.upper())
@@ -91,24 +275,15 @@ class NewsMonitor:
             keywords = [symbol, f"${symbol}"]
             
             # Add company-specific keywords
-            company_keywords = {
-                "AAPL": ["Apple", "iPhone", "Tim Cook", "iOS"],
-                "TSLA": ["Tesla", "Elon Musk", "EV", "electric vehicle"],
-                "MSFT": ["Microsoft", "Windows", "Azure", "Satya Nadella"],
-                "GOOGL": ["Google", "Alphabet", "Android", "Sundar Pichai"],
-                "AMZN": ["Amazon", "AWS", "Jeff Bezos", "Andy Jassy"],
-                "META": ["Meta", "Facebook", "Instagram", "Mark Zuckerberg"],
-                "NVDA": ["Nvidia", "GPU", "AI chips", "Jensen Huang"],
-                "BTC": ["Bitcoin", "cryptocurrency", "crypto", "blockchain"],
-                "ETH": ["Ethereum", "crypto", "DeFi", "smart contracts"]
-            }
-            
-            if symbol.upper() in company_keywords:
-                keywords.extend(company_keywords[symbol.upper()])
+            keywords.extend(_COMPANY_KEYWORDS.get(symbol.upper(), ()))
         
-        # Store keyword-symbol mapping
+        # Store keyword-symbol mapping and its inverse
+        symbol_keywords = self._symbol_to_keywords.setdefault(symbol.upper(), [])
         for keyword in keywords:
             self.keyword_alerts[keyword.lower()].append(symbol.upper())
+            if keyword.lower() not in symbol_keywords:
+                symbol_keywords.append(keyword.lower())
+        self._keyword_re = None
             
         logger.info(f"Added news monitoring for {symbol} with keywords: {keywords}")
     
@@ -118,11 +293,13 @@ class NewsMonitor:
         self.monitored_symbols.discard(symbol)
         
         # Remove from keyword mappings
-        for keyword, symbols in list(self.keyword_alerts.items()):
-            if symbol in symbols:
+        for keyword in self._symbol_to_keywords.pop(symbol, []):
+            symbols = self.keyword_alerts.get(keyword)
+            if symbols and symbol in symbols:
                 symbols.remove(symbol)
                 if not symbols:
                     del self.keyword_alerts[keyword]
+        self._keyword_re = None
                     
         logger.info(f"Removed news monitoring for {symbol}")
     
@@ -132,10 +309,11 @@ class NewsMonitor:
         language: str = "en",
         sort_by: str = "relevancy",
         page_size: int = 20,
-        from_date: Optional[datetime] = None
+        from_date: Optional[datetime] = None,
+        top_k: Optional[int] = None
     ) -> List[NewsArticle]:
-        """Search for news articles"""
-        if not self.newsapi:
+        """Search for news articles, optionally keeping only the top_k most relevant"""
+        if not self.live_mode:
             # Return filtered mock news data based on query
             mock_news = self._get_mock_market_news()
             # Simple search filter - check if query is in title or description
@@ -147,113 +325,116 @@ class NewsMonitor:
                     any(query_lower in symbol.lower() for symbol in article.symbols)):
                     filtered_news.append(article)
             
-            return filtered_news[:page_size]
+            # Newest first, as the mock feed is ordered
+            filtered_news.sort(key=lambda x: x.published_at, reverse=True)
+            limit = min(page_size, top_k) if top_k else page_size
+            return filtered_news[:limit]
         
         # Check cache first
-        cache_key = f"{query}_{language}_{sort_by}_{page_size}"
-        if cache_key in self.cache:
-            cached_time, cached_articles = self.cache[cache_key]
-            if datetime.now() - cached_time < self.cache_duration:
-                logger.debug(f"Returning cached news for query: {query}")
-                return cached_articles
+        cache_key = f"news:search:{query}_{language}_{sort_by}_{page_size}"
+        cached_articles = await self._get_cached(cache_key)
+        if cached_articles is not None:
+            logger.debug(f"Returning cached news for query: {query}")
+            return cached_articles[:top_k]
         
+        # Join an identical search that is already in flight
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            logger.debug(f"Awaiting in-flight news search for query: {query}")
+            return (await asyncio.shield(pending))[:top_k]
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            articles = await self._fetch_search_results(
+                cache_key, query, language, sort_by, page_size, from_date
+            )
+            future.set_result(articles)
+            return articles[:top_k]
+        finally:
+            del self._inflight[cache_key]
+            # If the leader was cancelled or failed, followers get an empty result like a failed search
+            if not future.done():
+                future.set_result([])
+    
+    async def _fetch_search_results(
+        self,
+        cache_key: str,
+        query: str,
+        language: str,
+        sort_by: str,
+        page_size: int,
+        from_date: Optional[datetime]
+    ) -> List[NewsArticle]:
+        """Query NewsAPI for articles and cache the scored results"""
         try:
             # Default to last 24 hours if no date specified
             if not from_date:
                 from_date = datetime.now() - timedelta(days=1)
             
             # Search news
-            response = self.newsapi.get_everything(
-                q=query,
-                language=language,
-                sort_by=sort_by,
-                page_size=page_size,
-                from_param=from_date.strftime('%Y-%m-%d')
-            )
+            response = await self._request("/everything", {
+                "q": query,
+                "language": language,
+                "sortBy": sort_by,
+                "pageSize": page_size,
+                "from": from_date.strftime('%Y-%m-%d')
+            })
             
+            now_ts = time.time()
             articles = []
-            for article_data in response.get('articles', []):
-                # Parse published date
-                published_at = None
-                if article_data.get('publishedAt'):
-                    try:
-                        published_at = datetime.fromisoformat(
-                            article_data['publishedAt'].replace('Z', '+00:00')
-                        )
-                    except:
-                        pass
-                
-                article = NewsArticle(
-                    title=article_data.get('title', ''),
-                    description=article_data.get('description', ''),
-                    source=article_data.get('source', {}).get('name', 'Unknown'),
-                    url=article_data.get('url', ''),
-                    published_at=published_at,
-                    symbols=self._extract_symbols(article_data)
-                )
+            articles_data = response.get('articles', [])
+            symbols_by_article = self._extract_symbols_batch(articles_data)
+            for article_data, symbols in zip(articles_data, symbols_by_article):
+                article = self._parse_article(article_data, symbols)
                 
                 # Calculate relevance score based on keyword matches
-                article.relevance_score = self._calculate_relevance(article, query)
+                article.relevance_score = self._calculate_relevance(article, query, now_ts)
                 articles.append(article)
             
             # Sort by relevance score
             articles.sort(key=lambda x: x.relevance_score, reverse=True)
             
             # Update cache
-            self.cache[cache_key] = (datetime.now(), articles)
+            await self._set_cached(cache_key, articles)
             
             return articles
             
+        except NewsAPIException as e:
+            logger.error(f"NewsAPI error: {e}")
+            return []
         except Exception as e:
-            if "NewsAPIException" in str(type(e)):
-                logger.error(f"NewsAPI error: {e}")
-            else:
-                logger.error(f"Error searching news: {e}")
+            logger.error(f"Error searching news: {e}")
             return []
     
     async def get_market_news(self, category: str = "business") -> List[NewsArticle]:
         """Get top business/market news"""
-        if not self.newsapi:
+        if not self.live_mode:
             logger.warning(f"📰 No real API configured (API key: {self.api_key[:10] + '...' if self.api_key and len(self.api_key) > 10 else self.api_key})")
             # Return mock news data for demo purposes
             return self._get_mock_market_news()
         
-        cache_key = f"headlines_{category}"
-        if cache_key in self.cache:
-            cached_time, cached_articles = self.cache[cache_key]
-            if datetime.now() - cached_time < self.cache_duration:
-                return cached_articles
+        cache_key = f"news:headlines:{category}"
+        cached_articles = await self._get_cached(cache_key)
+        if cached_articles is not None:
+            return cached_articles
         
         try:
-            response = self.newsapi.get_top_headlines(
-                category=category,
-                language='en',
-                page_size=30
-            )
+            response = await self._request("/top-headlines", {
+                "category": category,
+                "language": "en",
+                "pageSize": 30
+            })
             
-            articles = []
-            for article_data in response.get('articles', []):
-                published_at = None
-                if article_data.get('publishedAt'):
-                    try:
-                        published_at = datetime.fromisoformat(
-                            article_data['publishedAt'].replace('Z', '+00:00')
-                        )
-                    except:
-                        pass
-                
-                article = NewsArticle(
-                    title=article_data.get('title', ''),
-                    description=article_data.get('description', ''),
-                    source=article_data.get('source', {}).get('name', 'Unknown'),
-                    url=article_data.get('url', ''),
-                    published_at=published_at,
-                    symbols=self._extract_symbols(article_data)
-                )
-                articles.append(article)
+            articles_data = response.get('articles', [])
+            symbols_by_article = self._extract_symbols_batch(articles_data)
+            articles = [
+                self._parse_article(article_data, symbols)
+                for article_data, symbols in zip(articles_data, symbols_by_article)
+            ]
             
             # Update cache
-            self.cache[cache_key] = (datetime.now(), articles)
+            await self._set_cached(cache_key, articles)
             
             return articles
             
@@ -261,16 +442,13 @@ class NewsMonitor:
             logger.error(f"Error fetching market news: {e}")
             return []
     
-    async def get_symbol_news(self, symbol: str) -> List[NewsArticle]:
+    async def get_symbol_news(self, symbol: str, top_k: Optional[int] = None) -> List[NewsArticle]:
         """Get news for a specific symbol"""
         # Build query based on symbol and its keywords
-        keywords = [symbol]
-        for keyword, symbols in self.keyword_alerts.items():
-            if symbol.upper() in symbols:
-                keywords.append(keyword)
+        keywords = [symbol] + self._symbol_to_keywords.get(symbol.upper(), [])[:4]
         
-        query = " OR ".join(f'"{k}"' for k in keywords[:5])  # Limit to 5 keywords
-        return await self.search_news(query)
+        query = " OR ".join(f'"{k}"' for k in keywords)  # Limit to 5 keywords
+        return await self.search_news(query, top_k=top_k)
     
     async def monitor_news_alerts(self) -> List[Dict]:
         """Check for news alerts based on monitored symbols"""
@@ -279,108 +457,122 @@ class NewsMonitor:
         if not self.monitored_symbols:
             return alerts
         
-        # Search for news on each monitored symbol
-        for symbol in self.monitored_symbols:
-            articles = await self.get_symbol_news(symbol)
+        async def fetch(symbol: str):
+            return symbol, await self.get_symbol_news(symbol, top_k=5)  # Top 5 most relevant
+        
+        # Search for news on all monitored symbols concurrently
+        results = await asyncio.gather(
+            *(fetch(symbol) for symbol in self.monitored_symbols),
+            return_exceptions=True
+        )
+        
+        now_iso = datetime.now().isoformat()
+        news_alerts: List[NewsAlert] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error(f"Error fetching symbol news: {result}")
+                continue
+            symbol, articles = result
             
             # Check for high-relevance articles (potential market movers)
-            for article in articles[:5]:  # Top 5 most relevant
-                if article.relevance_score > 0.7:  # High relevance threshold
-                    alert = {
-                        "type": "major_news",
-                        "severity": "high" if article.relevance_score > 0.85 else "medium",
-                        "title": f"Breaking: {symbol} - {article.title[:50]}...",
-                        "message": article.description[:200] if article.description else article.title,
-                        "timestamp": article.published_at.isoformat() if article.published_at else datetime.now().isoformat(),
-                        "source": article.source,
-                        "url": article.url,
-                        "symbol": symbol,
-                        "metadata": {
-                            "relevance_score": article.relevance_score,
-                            "full_title": article.title
-                        }
-                    }
-                    alerts.append(alert)
+            for article in articles:
+                if article.relevance_score <= ALERT_RELEVANCE_THRESHOLD:  # Sorted by relevance, so nothing further qualifies
+                    break
+                news_alerts.append(NewsAlert(symbol, article, now_iso))
         
-        return alerts
+        return [alert.to_dict() for alert in news_alerts]
     
-    def _extract_symbols(self, article_data: Dict) -> List[str]:
-        """Extract stock symbols mentioned in the article"""
-        symbols = []
-        text = f"{article_data.get('title', '')} {article_data.get('description', '')}"
-        
-        # Look for stock symbols (e.g., $AAPL, AAPL)
-        import re
-        # Updated pattern to match stock symbols
-        pattern = r'\$[A-Z]{1,5}\b|(?:^|\s)([A-Z]{2,5})(?:\s|$|[,.])'
-        matches = re.findall(pattern, text)
-        
-        # Common stock symbols to recognize
-        common_symbols = {
-            'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'META', 'TSLA', 'NVDA', 
-            'BRK', 'V', 'JNJ', 'WMT', 'JPM', 'PG', 'MA', 'UNH', 'HD', 'DIS',
-            'BAC', 'XOM', 'ABBV', 'CVX', 'PFE', 'CSCO', 'TMO', 'COST', 'PEP',
-            'AVGO', 'KO', 'MRK', 'LLY', 'ACN', 'NKE', 'ADBE', 'NFLX', 'ABT',
-            'AMD', 'INTC', 'WFC', 'CRM', 'ORCL', 'MDT', 'UPS', 'TXN', 'MS',
-            'BA', 'BMY', 'RTX', 'NOW', 'QCOM', 'CVS', 'GS', 'HON', 'SCHW',
-            'SPY', 'QQQ', 'DIA', 'IWM', 'VTI', 'VOO',  # Popular ETFs
-            'GM', 'F', 'UBER', 'LYFT', 'ABNB', 'COIN', 'HOOD', 'PLTR', 'SOFI'
-        }
+    def _parse_article(self, article_data: Dict, symbols: List[str]) -> NewsArticle:
+        """Build a NewsArticle from a NewsAPI article payload"""
+        # Parse published date (fromisoformat accepts the trailing 'Z' on Python 3.11+)
+        published_at = None
+        if published_raw := article_data.get('publishedAt'):
+            try:
+                published_at = datetime.fromisoformat(published_raw)
+            except (ValueError, TypeError):
+                pass
         
-        # Also check for company names and map to symbols
-        company_mappings = {
-            'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL', 'alphabet': 'GOOGL',
-            'amazon': 'AMZN', 'meta': 'META', 'facebook': 'META', 'tesla': 'TSLA',
-            'nvidia': 'NVDA', 'berkshire': 'BRK', 'visa': 'V', 'johnson': 'JNJ',
-            'walmart': 'WMT', 'jpmorgan': 'JPM', 'jp morgan': 'JPM', 'disney': 'DIS',
-            'netflix': 'NFLX', 'adobe': 'ADBE', 'salesforce': 'CRM', 'oracle': 'ORCL',
-            'intel': 'INTC', 'amd': 'AMD', 'ford': 'F', 'general motors': 'GM',
-            'gm': 'GM', 'uber': 'UBER', 'coinbase': 'COIN', 'robinhood': 'HOOD',
-            'figma': 'FIGM', 'santander': 'SAN', 'costco': 'COST', 'lululemon': 'LULU',
-            'constellation': 'STZ', 'blackrock': 'BLK'
-        }
+        return NewsArticle(
+            title=article_data.get('title', ''),
+            description=article_data.get('description', ''),
+            source=article_data.get('source', {}).get('name', 'Unknown'),
+            url=article_data.get('url', ''),
+            published_at=published_at,
+            symbols=symbols
+        )
+    
+    def _extract_symbols_batch(self, articles_data: List[Dict]) -> List[List[str]]:
+        """Extract stock symbols for a batch of articles with one scan per pattern"""
+        texts = [f"{a.get('title', '')} {a.get('description', '')}" for a in articles_data]
         
-        # Extract symbols from regex matches
-        for match in matches:
-            if isinstance(match, tuple):
-                symbol = match[0] if match[0] else None
-            else:
-                symbol = match.replace('$', '').strip()
+        # Articles repeated across queries and pages reuse their memoized symbols
+        results: List[Optional[Tuple[str, ...]]] = [self._symbol_memo.get(text) for text in texts]
+        pending = [i for i, symbols in enumerate(results) if symbols is None]
+        if pending:
+            found: List[Set[str]] = [set() for _ in pending]
             
-            if symbol and len(symbol) >= 2 and len(symbol) <= 5 and symbol.isalpha():
-                if symbol in common_symbols:
-                    symbols.append(symbol)
-        
-        # Check for company names in text
-        text_lower = text.lower()
-        for company_name, symbol in company_mappings.items():
-            if company_name in text_lower:
-                symbols.append(symbol)
+            # Offsets where each unscanned article's text starts in the joined buffer
+            starts = []
+            offset = 0
+            for i in pending:
+                starts.append(offset)
+                offset += len(texts[i]) + len(_BATCH_SEPARATOR)
+            buffer = _BATCH_SEPARATOR.join(texts[i] for i in pending)
+            
+            for match in _SYMBOL_RE.finditer(buffer):
+                symbol = match.group(1)
+                if symbol in _COMMON_SYMBOLS:
+                    found[bisect_right(starts, match.start(1)) - 1].add(symbol)
+            
+            for match in _COMPANY_RE.finditer(buffer):
+                found[bisect_right(starts, match.start()) - 1].add(_COMPANY_MAPPINGS[match.group().lower()])
+            
+            for i, symbols in zip(pending, found):
+                results[i] = self._symbol_memo[texts[i]] = tuple(symbols)
         
-        # Return unique symbols
-        return list(set(symbols))
+        return [list(symbols) for symbols in results]
+    
+    def _get_keyword_re(self) -> Optional[re.Pattern]:
+        """Get the matcher for all monitored keywords, rebuilding it after changes"""
+        if self._keyword_re is None and self.keyword_alerts:
+            self._keyword_re = re.compile("|".join(
+                re.escape(keyword) for keyword in sorted(self.keyword_alerts, key=len, reverse=True)
+            ))
+        return self._keyword_re
     
-    def _calculate_relevance(self, article: NewsArticle, query: str) -> float:
+    def _bm25(self, term_freq: Counter, doc_len: int) -> float:
+        """BM25 term-frequency score of an article's keyword matches (uniform keyword weight)"""
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / AVG_ARTICLE_WORDS)
+        # Each keyword contributes ~1 for a single mention in an average-length article
+        return sum(freq * (BM25_K1 + 1) / (freq + norm) for freq in term_freq.values())
+    
+    def _calculate_relevance(self, article: NewsArticle, query: str, now_ts: Optional[float] = None) -> float:
         """Calculate relevance score for an article"""
         score = 0.0
-        query_lower = query.lower()
+        terms = _query_terms(query)
+        title_lc = article.title.lower()
+        desc_lc = article.description.lower() if article.description else ""
         
-        # Check title (highest weight)
-        if query_lower in article.title.lower():
+        # Check title (highest weight); a symbol query matches on any of its quoted terms
+        if any(term in title_lc for term in terms):
             score += 0.5
         
         # Check description
-        if article.description and query_lower in article.description.lower():
+        if desc_lc and any(term in desc_lc for term in terms):
             score += 0.3
         
-        # Check for related keywords
-        for keyword in self.keyword_alerts:
-            if keyword in article.title.lower() or (article.description and keyword in article.description.lower()):
-                score += 0.1
+        # BM25 score of related keywords, capped at three keywords' worth so
+        # keyword-heavy articles don't dominate
+        keyword_re = self._get_keyword_re()
+        if keyword_re is not None:
+            term_freq = Counter(keyword_re.findall(f"{title_lc}\x00{desc_lc}"))
+            if term_freq:
+                doc_len = len(title_lc.split()) + len(desc_lc.split())
+                score += 0.1 * min(self._bm25(term_freq, doc_len), 3)
         
         # Boost for recent articles
         if article.published_at:
-            hours_old = (datetime.now() - article.published_at.replace(tzinfo=None)).total_seconds() / 3600
+            hours_old = ((now_ts or time.time()) - article.published_at.timestamp()) / 3600
             if hours_old < 1:
                 score += 0.2
             elif hours_old < 6:
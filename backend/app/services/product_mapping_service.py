@@ -2,8 +2,72 @@
 HSBC Product Mapping Service
 Maps topics/contexts to relevant HSBC products
 """
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional
+from collections import Counter
+from functools import lru_cache
 import random
+import re
+
+# Topic keywords mapping
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    "crypto": ["crypto", "bitcoin", "ethereum", "digital asset", "blockchain", "defi"],
+    "stocks": ["stock", "equity", "shares", "trading", "market", "portfolio"],
+    "wealth": ["wealth", "portfolio", "investment", "asset allocation", "diversification"],
+    "risk": ["risk", "insurance", "protection", "hedge", "volatility", "safety"],
+    "esg": ["sustainable", "esg", "green", "climate", "environmental", "social"],
+}
+
+# Keyword -> categories index and a single matcher over all keywords
+_KEYWORD_CATEGORIES: Dict[str, List[str]] = {
+    keyword: [category for category, keywords in TOPIC_KEYWORDS.items() if keyword in keywords]
+    for keywords in TOPIC_KEYWORDS.values()
+    for keyword in keywords
+}
+# Zero-width lookahead, so overlapping keywords ("digital asset" / "asset allocation")
+# are all found; the longest keyword starting at each position is reported
+_KEYWORD_RE = re.compile("(?=(" + "|".join(
+    re.escape(keyword) for keyword in sorted(_KEYWORD_CATEGORIES, key=len, reverse=True)
+) + "))")
+# Every keyword contained in a matched keyword is present too, e.g. nested prefixes
+_CONTAINED_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    keyword: frozenset(other for other in _KEYWORD_CATEGORIES if other in keyword)
+    for keyword in _KEYWORD_CATEGORIES
+}
+# Characters on each side of the topic/context join a keyword can span
+_SEAM = max(map(len, _KEYWORD_CATEGORIES)) - 1
+
+
+def _find_keywords(text: str) -> FrozenSet[str]:
+    """All distinct keywords occurring anywhere in lowercased text, as substring checks would find"""
+    return frozenset().union(*(_CONTAINED_KEYWORDS[keyword] for keyword in set(_KEYWORD_RE.findall(text))))
+
+
+@lru_cache(maxsize=1024)
+def _topic_keywords(topic: str) -> FrozenSet[str]:
+    """Distinct keywords in a lowercased topic"""
+    return _find_keywords(topic)
+
+
+def _category_for(topic: str, context: str) -> str:
+    """Determine product category based on topic and context"""
+    # Keywords of the topic are memoized; the per-session context is scanned each call
+    topic = topic.lower()
+    keywords = _topic_keywords(topic)
+    if context:
+        # Scanned apart, plus the join, matching a scan of "topic context"
+        context = context.lower()
+        keywords = keywords | _find_keywords(context) | _find_keywords(f"{topic[-_SEAM:]} {context[:_SEAM]}")
+    
+    # Score every category from the distinct keywords found
+    scores = Counter()
+    for keyword in keywords:
+        scores.update(_KEYWORD_CATEGORIES[keyword])
+    
+    # Return category with highest score, or general if no matches
+    if scores:
+        return max(TOPIC_KEYWORDS, key=lambda category: scores[category])
+    return "general"
+
 
 class ProductMappingService:
     """Service for mapping topics to HSBC products"""
@@ -108,48 +172,24 @@ class ProductMappingService:
         }
         
         # Topic keywords mapping
-        self.topic_keywords = {
-            "crypto": ["crypto", "bitcoin", "ethereum", "digital asset", "blockchain", "defi"],
-            "stocks": ["stock", "equity", "shares", "trading", "market", "portfolio"],
-            "wealth": ["wealth", "portfolio", "investment", "asset allocation", "diversification"],
-            "risk": ["risk", "insurance", "protection", "hedge", "volatility", "safety"],
-            "esg": ["sustainable", "esg", "green", "climate", "environmental", "social"],
+        self.topic_keywords = TOPIC_KEYWORDS
+        
+        # Most relevant product per category, prebuilt for get_relevant_product
+        self._first_product: Dict[str, Dict[str, str]] = {
+            category: {**products[0], "category": category}
+            for category, products in self.product_catalog.items()
         }
     
     def get_relevant_product(self, topic: str, context: Optional[str] = None) -> Dict[str, str]:
         """Get the most relevant HSBC product for a given topic"""
-        # Determine category from topic and context
+        # Select the most relevant product of the determined category (can be enhanced with ML later)
         category = self._determine_category(topic, context)
-        
-        # Get products from the category
-        products = self.product_catalog.get(category, self.product_catalog["general"])
-        
-        # Select the most relevant product (can be enhanced with ML later)
-        selected = products[0] if products else self.product_catalog["general"][0]
-        
-        return {
-            "id": selected["id"],
-            "name": selected["name"],
-            "description": selected["description"],
-            "benefit": selected["benefit"],
-            "category": category
-        }
+        # Copy, so callers that modify the result don't alter the shared lookup
+        return dict(self._first_product.get(category, self._first_product["general"]))
     
     def _determine_category(self, topic: str, context: Optional[str] = None) -> str:
         """Determine product category based on topic and context"""
-        combined_text = f"{topic} {context or ''}".lower()
-        
-        # Check each category's keywords
-        scores = {}
-        for category, keywords in self.topic_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in combined_text)
-            if score > 0:
-                scores[category] = score
-        
-        # Return category with highest score, or general if no matches
-        if scores:
-            return max(scores, key=scores.get)
-        return "general"
+        return _category_for(topic, context or "")
     
     def get_products_by_risk_level(self, risk_level: str) -> List[Dict[str, str]]:
         """Get products suitable for a specific risk level"""
@@ -6,21 +6,83 @@ import os
 import re
 import yaml
 import json
+import orjson
+from cachetools import LRUCache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Union
 from string import Template
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Template variable ({{var}}) and fenced JSON block matchers
+_VAR_RE = re.compile(r'\{\{([^}]+)\}\}')
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# System prompt layout; blocks carry their own leading newlines
+_SYSTEM_PROMPT_TEMPLATE = (
+    "You are a {role}.\n"
+    "\nCore Principles:{principles_block}\n"
+    "\nRisk Allocation Guidelines:{risk_block}\n"
+    "\nAlways end responses with appropriate disclaimers.\n"
+    "Think step-by-step but only show the final answer."
+)
+
+
+def _freeze(value: Any) -> Any:
+    """Build a hashable, type-tagged cache key for a template context value"""
+    if isinstance(value, dict):
+        # Insertion order is kept: it decides the order json.dumps renders the keys in
+        return (dict, tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(item) for item in value))
+    return (type(value), value)
+
 class PromptService:
     """Service for managing and rendering prompt templates"""
     
     def __init__(self, prompts_dir: str = "prompts"):
         self.prompts_dir = Path(prompts_dir)
         self.system_config = self._load_system_config()
+        self._system_prompt = self._build_system_prompt()
+        self._index_system_config()
         self._template_cache = {}
+        # Pre-parsed templates: literal strings and (path, placeholder) variable slots
+        self._template_tokens: Dict[str, List[Union[str, Tuple[Tuple[str, ...], str]]]] = {}
+        # Templates without {{variables}} render to their own text
+        self._static_templates: Dict[str, str] = {}
+        self._load_task_templates()
+        # Rendered prompts keyed by (template_name, frozen context)
+        self._render_cache: LRUCache = LRUCache(maxsize=512)
+    
+    def _index_system_config(self):
+        """Precompute lookups over the (immutable) system config"""
+        self._products_by_category = self.system_config.get('hsbc_products', {})
+        self._all_products = [
+            product
+            for cat_products in self._products_by_category.values()
+            if isinstance(cat_products, list)
+            for product in cat_products
+        ]
         
+        # Risk tier -> (volatile allocation, focus), with the moderate fallback resolved
+        tiers = self.system_config.get('risk_allocation_tiers', {})
+        self._risk_profiles = {
+            name: (data.get('volatile_assets', '3-5%'), data.get('focus', 'balanced approach'))
+            for name, data in tiers.items()
+        }
+        moderate = tiers.get('moderate', {})
+        self._default_risk_profile = (
+            moderate.get('volatile_assets', '3-5%'),
+            moderate.get('focus', 'balanced approach')
+        )
+    
     def _load_system_config(self) -> Dict[str, Any]:
         """Load system-level prompt configuration"""
         system_file = self.prompts_dir / "system.fin.yaml"
@@ -31,7 +93,7 @@ class PromptService:
             
         try:
             with open(system_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=_YamlLoader)
         except Exception as e:
             logger.error(f"Failed to load system config: {e}")
             return self._get_default_system_config()
@@ -54,85 +116,112 @@ class PromptService:
     
     def get_system_prompt(self) -> str:
         """Get the formatted system prompt"""
+        return self._system_prompt
+    
+    def _build_system_prompt(self) -> str:
+        """Build the system prompt from configuration"""
         config = self.system_config
         
-        # Build system prompt from configuration
-        prompt_parts = [
-            f"You are a {config['role']}.",
-            "\nCore Principles:"
-        ]
-        
-        for principle in config.get('principles', []):
-            prompt_parts.append(f"- {principle}")
-            
-        # Add risk allocation guidelines
-        prompt_parts.append("\nRisk Allocation Guidelines:")
-        for risk_level, details in config.get('risk_allocation_tiers', {}).items():
-            prompt_parts.append(
-                f"- {risk_level.capitalize()}: {details.get('volatile_assets', 'N/A')} volatile assets"
+        # Each block is joined in one pass and formatted into the template
+        return _SYSTEM_PROMPT_TEMPLATE.format(
+            role=config['role'],
+            principles_block="".join(f"\n- {principle}" for principle in config.get('principles', [])),
+            risk_block="".join(
+                f"\n- {risk_level.capitalize()}: {details.get('volatile_assets', 'N/A')} volatile assets"
                 f" - Focus: {details.get('focus', 'balanced approach')}"
+                for risk_level, details in config.get('risk_allocation_tiers', {}).items()
             )
+        )
+    
+    def _load_task_templates(self):
+        """Read and pre-parse every task template, keyed by file name and stem"""
+        for template_path in sorted((self.prompts_dir / "tasks").glob("*.md")):
+            try:
+                template_content = template_path.read_text(encoding='utf-8')
+            except Exception as e:
+                logger.error(f"Failed to load template {template_path.name}: {e}")
+                continue
             
-        # Add compliance section
-        prompt_parts.append("\nAlways end responses with appropriate disclaimers.")
-        prompt_parts.append("Think step-by-step but only show the final answer.")
-        
-        return "\n".join(prompt_parts)
+            tokens = self._parse_template(template_content)
+            is_static = all(isinstance(token, str) for token in tokens)
+            for name in (template_path.name, template_path.stem):
+                self._template_cache[name] = template_content
+                self._template_tokens[name] = tokens
+                if is_static:
+                    self._static_templates[name] = template_content
+    
+    def _parse_template(self, template_content: str) -> List[Union[str, Tuple[Tuple[str, ...], str]]]:
+        """Split a template once into literal and variable tokens"""
+        # _VAR_RE.split alternates literal text and {{variable}} names
+        tokens = []
+        for i, piece in enumerate(_VAR_RE.split(template_content)):
+            if i % 2 == 0:
+                if piece:
+                    tokens.append(piece)
+            else:
+                # Nested variables like event.title become ('event', 'title')
+                tokens.append((tuple(piece.strip().split('.')), f"{{{{{piece}}}}}"))
+        return tokens
     
     def load_task_template(self, template_name: str) -> str:
         """Load a task-specific template"""
-        # Check cache first
-        if template_name in self._template_cache:
+        try:
             return self._template_cache[template_name]
-            
-        template_path = self.prompts_dir / "tasks" / template_name
-        
-        if not template_path.exists():
-            # Try with .md extension if not provided
-            if not template_name.endswith('.md'):
-                template_path = self.prompts_dir / "tasks" / f"{template_name}.md"
-                
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template not found: {template_name}")
-            
+        except KeyError:
+            raise FileNotFoundError(f"Template not found: {template_name}") from None
+    
+    def _get_template_tokens(self, template_name: str) -> List[Union[str, Tuple[Tuple[str, ...], str]]]:
+        """Get a template's pre-parsed tokens"""
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-                self._template_cache[template_name] = template_content
-                return template_content
-        except Exception as e:
-            logger.error(f"Failed to load template {template_name}: {e}")
-            raise
+            return self._template_tokens[template_name]
+        except KeyError:
+            raise FileNotFoundError(f"Template not found: {template_name}") from None
     
     def render_template(self, template_name: str, context: Dict[str, Any]) -> str:
         """Render a template with the given context"""
-        template_content = self.load_task_template(template_name)
+        static = self._static_templates.get(template_name)
+        if static is not None:
+            return static
         
-        # Simple template rendering using regex
+        try:
+            cache_key = (template_name, _freeze(context))
+            hash(cache_key)
+        except TypeError:
+            # Unhashable context values, render without caching
+            return self._render_tokens(template_name, context)
+        
+        rendered = self._render_cache.get(cache_key)
+        if rendered is None:
+            rendered = self._render_tokens(template_name, context)
+            self._render_cache[cache_key] = rendered
+        return rendered
+    
+    def _render_tokens(self, template_name: str, context: Dict[str, Any]) -> str:
+        """Render a template's token list against the context"""
         # Supports {{variable}} syntax
-        def replace_variable(match):
-            var_path = match.group(1).strip()
+        parts = []
+        for token in self._get_template_tokens(template_name):
+            if isinstance(token, str):
+                parts.append(token)
+                continue
             
-            # Handle nested variables like event.title
-            parts = var_path.split('.')
+            path, placeholder = token
             value = context
-            
-            for part in parts:
+            for part in path:
                 if isinstance(value, dict) and part in value:
                     value = value[part]
                 else:
                     # Variable not found, keep placeholder
-                    return match.group(0)
-                    
-            # Convert to string
-            if isinstance(value, (dict, list)):
-                return json.dumps(value, ensure_ascii=False)
-            return str(value)
-        
-        # Replace all {{variable}} patterns
-        rendered = re.sub(r'\{\{([^}]+)\}\}', replace_variable, template_content)
+                    parts.append(placeholder)
+                    break
+            else:
+                # Convert to string
+                if isinstance(value, (dict, list)):
+                    parts.append(json.dumps(value, ensure_ascii=False))
+                else:
+                    parts.append(str(value))
         
-        return rendered
+        return "".join(parts)
     
     def build_prompt(self, template_name: str, **kwargs) -> str:
         """Convenience method to render a template with keyword arguments"""
@@ -140,28 +229,21 @@ class PromptService:
     
     def get_risk_profile_context(self, risk_profile: str) -> Dict[str, Any]:
         """Get context data for a specific risk profile"""
-        tiers = self.system_config.get('risk_allocation_tiers', {})
-        profile_data = tiers.get(risk_profile.lower(), tiers.get('moderate', {}))
+        volatile_assets, focus = self._risk_profiles.get(risk_profile.lower(), self._default_risk_profile)
         
         return {
             'user_risk_profile': risk_profile,
-            'volatile_asset_allocation': profile_data.get('volatile_assets', '3-5%'),
-            'risk_focus': profile_data.get('focus', 'balanced approach')
+            'volatile_asset_allocation': volatile_assets,
+            'risk_focus': focus
         }
     
     def get_hsbc_product(self, category: str = None) -> str:
         """Get a relevant HSBC product recommendation"""
-        products = self.system_config.get('hsbc_products', {})
-        
-        if category and category in products:
-            product_list = products[category]
+        if category and category in self._products_by_category:
+            product_list = self._products_by_category[category]
         else:
             # Get a product from any category
-            all_products = []
-            for cat_products in products.values():
-                if isinstance(cat_products, list):
-                    all_products.extend(cat_products)
-            product_list = all_products
+            product_list = self._all_products
             
         if product_list:
             # In production, this could be more intelligent
@@ -181,14 +263,20 @@ class PromptService:
         try:
             # Try to extract JSON from the response
             # Look for JSON blocks in markdown
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(response)
             if json_match:
                 json_str = json_match.group(1)
             else:
-                # Try to parse the entire response as JSON
-                json_str = response
+                # Try to parse the entire response as JSON, skipping prose outright
+                json_str = response.strip()
+                if not json_str or json_str[0] not in '{[':
+                    raise ValueError("Invalid JSON response: no JSON found")
                 
-            parsed = json.loads(json_str)
+            try:
+                parsed = orjson.loads(json_str)
+            except orjson.JSONDecodeError:
+                # Stdlib accepts a few non-standard forms (NaN, Infinity) orjson rejects
+                parsed = json.loads(json_str)
             
             # Basic schema validation if provided
             if expected_schema:
@@ -201,7 +289,7 @@ class PromptService:
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {e}")
-            logger.debug(f"Response was: {response}")
+            logger.debug("Response was: %s", response)
             raise ValueError(f"Invalid JSON response: {str(e)}")
         except Exception as e:
             logger.error(f"Validation error: {e}")
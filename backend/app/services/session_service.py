@@ -2,15 +2,47 @@
 Session Management Service
 Manages conversation state across multiple interactions
 """
-import json
 import logging
+import re
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+import orjson
 import redis.asyncio as aioredis
-from app.models.llm_models import SessionState
+from app.models.llm_models import SessionState, MAX_CONTEXT_TURNS
 
 logger = logging.getLogger(__name__)
 
+# Allocation percentages and risk level mentions, matched against lowercased responses
+_ALLOC_PATTERNS = (
+    ("crypto", re.compile(r'crypto[^\d]*(\d+(?:\.\d+)?)\s*%')),
+    ("stocks", re.compile(r'(?:stock|equity)[^\d]*(\d+(?:\.\d+)?)\s*%'))
+)
+_RISK_RE = re.compile(r'conservative|low risk|aggressive|high risk')
+_LOW_RISK_TERMS = frozenset(("conservative", "low risk"))
+
+# Atomic read-modify-write of a session in one round trip.
+# KEYS[1] session key; ARGV: default session, field changes, turn ('' for none), max turns, ttl
+_UPDATE_SESSION_LUA = """
+if cjson.decode_array_with_array_mt then
+    cjson.decode_array_with_array_mt(true)
+end
+local raw = redis.call('GET', KEYS[1])
+local session = cjson.decode(raw or ARGV[1])
+for field, value in pairs(cjson.decode(ARGV[2])) do
+    session[field] = value
+end
+if ARGV[3] ~= '' then
+    local context = session['conversation_context']
+    table.insert(context, cjson.decode(ARGV[3]))
+    while #context > tonumber(ARGV[4]) do
+        table.remove(context, 1)
+    end
+end
+local payload = cjson.encode(session)
+redis.call('SETEX', KEYS[1], ARGV[5], payload)
+return payload
+"""
+
 class SessionService:
     """Service for managing conversation sessions"""
     
@@ -18,6 +50,7 @@ class SessionService:
         self.redis_url = redis_url
         self._redis = None
         self._connected = False
+        self._update_script = None
     
     async def connect(self):
         """Connect to Redis"""
@@ -27,6 +60,7 @@ class SessionService:
                 encoding="utf-8",
                 decode_responses=True
             )
+            self._update_script = self._redis.register_script(_UPDATE_SESSION_LUA)
             self._connected = True
             logger.info("Connected to Redis for session management")
         except Exception as e:
@@ -43,11 +77,7 @@ class SessionService:
             # Try to get existing session
             session_data = await self._redis.get(f"session:{session_id}")
             if session_data:
-                data = json.loads(session_data)
-                # Convert datetime strings back to datetime objects
-                data['created_at'] = datetime.fromisoformat(data['created_at'])
-                data['updated_at'] = datetime.fromisoformat(data['updated_at'])
-                return SessionState(**data)
+                return self._load_session(session_data)
             
             # Create new session
             session = SessionState(session_id=session_id, user_id=user_id)
@@ -58,72 +88,96 @@ class SessionService:
             logger.error(f"Session get/create error: {e}")
             return SessionState(session_id=session_id, user_id=user_id)
     
+    def _load_session(self, session_data: str) -> SessionState:
+        """Build a SessionState from its stored JSON"""
+        data = orjson.loads(session_data)
+        # Lua cjson may encode empty arrays as objects
+        for field in ('conversation_context', 'hsbc_products_mentioned'):
+            if data.get(field) == {}:
+                data[field] = []
+        # Convert datetime strings back to datetime objects
+        data['created_at'] = datetime.fromisoformat(data['created_at'])
+        data['updated_at'] = datetime.fromisoformat(data['updated_at'])
+        return SessionState(**data)
+    
     async def save_session(self, session: SessionState, ttl: int = 3600):
         """Save session to Redis with TTL"""
         if not self._connected:
             return
         
         try:
-            # Convert to JSON-serializable format
-            data = session.dict()
-            data['created_at'] = data['created_at'].isoformat()
-            data['updated_at'] = data['updated_at'].isoformat()
-            
+            # Serialize straight to JSON; datetimes come out as ISO strings for fromisoformat on load
             await self._redis.setex(
                 f"session:{session.session_id}",
                 ttl,
-                json.dumps(data)
+                session.model_dump_json()
             )
         except Exception as e:
             logger.error(f"Session save error: {e}")
     
+    async def _apply_session_update(self, session_id: str, changes: Dict[str, Any],
+                                    turn: Optional[Dict[str, str]] = None, ttl: int = 3600) -> SessionState:
+        """Apply field changes and an optional conversation turn to a session"""
+        if self._connected and self._update_script:
+            try:
+                # Read, modify and write back server-side in a single round trip
+                session_data = await self._update_script(
+                    keys=[f"session:{session_id}"],
+                    args=[
+                        SessionState(session_id=session_id).model_dump_json(),
+                        orjson.dumps(changes),
+                        orjson.dumps(turn) if turn else "",
+                        MAX_CONTEXT_TURNS,
+                        ttl
+                    ]
+                )
+                return self._load_session(session_data)
+            except Exception as e:
+                logger.error(f"Session update script error: {e}")
+        
+        # Fallback to get/mutate/save
+        session = await self.get_or_create_session(session_id)
+        for field, value in changes.items():
+            setattr(session, field, value)
+        if turn:
+            # Bounded deque drops the oldest turn
+            session.conversation_context.append(turn)
+        await self.save_session(session, ttl)
+        return session
+    
     async def update_session_context(self, session_id: str, user_message: str, ai_response: str):
         """Update session with new conversation turn"""
-        session = await self.get_or_create_session(session_id)
+        now = datetime.utcnow()
         
-        # Add to conversation context
-        session.conversation_context.append({
+        # Add to conversation context, keeping only the last 10 turns
+        turn = {
             "user": user_message,
             "assistant": ai_response,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        # Keep only last 10 turns
-        if len(session.conversation_context) > 10:
-            session.conversation_context = session.conversation_context[-10:]
-        
-        session.updated_at = datetime.utcnow()
-        await self.save_session(session)
-        
-        return session
+            "timestamp": now.isoformat()
+        }
+        return await self._apply_session_update(session_id, {"updated_at": now}, turn)
     
     async def extract_allocations_from_response(self, session_id: str, response: str):
         """Extract and update allocation percentages from AI response"""
-        session = await self.get_or_create_session(session_id)
-        
-        # Simple regex patterns to extract percentages
-        import re
+        text = response.lower()
         
-        # Look for crypto allocation
-        crypto_pattern = r'crypto[^\d]*(\d+(?:\.\d+)?)\s*%'
-        crypto_match = re.search(crypto_pattern, response.lower())
-        if crypto_match:
-            session.update_allocation("crypto", float(crypto_match.group(1)))
+        # Record allocations through SessionState.update_allocation on a scratch state,
+        # then apply exactly the fields it set to the stored session
+        tracked = SessionState(session_id=session_id)
+        for asset_type, pattern in _ALLOC_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                tracked.update_allocation(asset_type, float(match.group(1)))
+        changes: Dict[str, Any] = tracked.model_dump(exclude_unset=True, exclude={"session_id"})
         
-        # Look for stock allocation
-        stock_pattern = r'(?:stock|equity)[^\d]*(\d+(?:\.\d+)?)\s*%'
-        stock_match = re.search(stock_pattern, response.lower())
-        if stock_match:
-            session.update_allocation("stocks", float(stock_match.group(1)))
+        # Look for risk level mentions, low risk taking precedence
+        risk_terms = set(_RISK_RE.findall(text))
+        if risk_terms & _LOW_RISK_TERMS:
+            changes["risk_level"] = "low"
+        elif risk_terms:
+            changes["risk_level"] = "high"
         
-        # Look for risk level mentions
-        if "conservative" in response.lower() or "low risk" in response.lower():
-            session.risk_level = "low"
-        elif "aggressive" in response.lower() or "high risk" in response.lower():
-            session.risk_level = "high"
-        
-        await self.save_session(session)
-        return session
+        return await self._apply_session_update(session_id, changes)
     
     async def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Get summary of session state"""
@@ -3,147 +3,252 @@ Yahoo Finance Service Module with Rate Limiting and Caching
 Handles real-time stock price monitoring and data fetching
 """
 
+import os
 import yfinance as yf
-from typing import Dict, List, Optional, Any, Tuple
+import orjson
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import asyncio
 from datetime import datetime, timedelta
 import logging
 from functools import lru_cache
 import time
 from collections import defaultdict
+from types import MappingProxyType
 import threading
-from .yahoo_finance_fallback import yahoo_finance_fallback
+from concurrent.futures import Future, ThreadPoolExecutor
+from cachetools import TTLCache
+import diskcache
+from .yahoo_finance_fallback import yahoo_finance_fallback, iso_now
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Major market indices and the prices used when an index can't be fetched (read-only)
+MARKET_INDICES = MappingProxyType({
+    "^GSPC": "S&P 500",
+    "^DJI": "Dow Jones",
+    "^IXIC": "NASDAQ",
+    "^VIX": "VIX"
+})
+_MOCK_INDEX_PRICES = MappingProxyType({"^GSPC": 5000, "^DJI": 38000, "^IXIC": 16000, "^VIX": 15})
+
+# Worker threads for fetching the market indices in parallel from sync callers
+_INDEX_POOL = ThreadPoolExecutor(max_workers=len(MARKET_INDICES), thread_name_prefix="idx")
+
+# Symbols offered by search_symbols, with lowercased fields and a bigram -> index map
+ALL_SYMBOLS = [
+    {"symbol": "AAPL", "name": "Apple Inc.", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "GOOGL", "name": "Alphabet Inc.", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "MSFT", "name": "Microsoft Corporation", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "AMZN", "name": "Amazon.com Inc.", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "TSLA", "name": "Tesla, Inc.", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "META", "name": "Meta Platforms Inc.", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "NVDA", "name": "NVIDIA Corporation", "type": "Stock", "exchange": "NASDAQ"},
+    {"symbol": "JPM", "name": "JPMorgan Chase & Co.", "type": "Stock", "exchange": "NYSE"},
+    {"symbol": "BAC", "name": "Bank of America Corp", "type": "Stock", "exchange": "NYSE"},
+    {"symbol": "WMT", "name": "Walmart Inc.", "type": "Stock", "exchange": "NYSE"},
+]
+ALL_SYMBOLS_LC = [(entry, entry["symbol"].lower(), entry["name"].lower()) for entry in ALL_SYMBOLS]
+BIGRAM_INDEX: Dict[str, set] = defaultdict(set)
+for _i, (_entry, _symbol_lc, _name_lc) in enumerate(ALL_SYMBOLS_LC):
+    for _text in (_symbol_lc, _name_lc):
+        for _j in range(len(_text) - 1):
+            BIGRAM_INDEX[_text[_j:_j + 2]].add(_i)
+
+
+def _compact_history(hist: pd.DataFrame) -> pd.DataFrame:
+    """Flatten a yfinance history frame and downcast volume for caching"""
+    df = hist.reset_index()
+    # Prices stay float64: float32 keeps only ~7 significant digits, losing cents above 100,000
+    if "Volume" in df and df["Volume"].dtype.kind == "i" and df["Volume"].max() < 2 ** 31:
+        df["Volume"] = df["Volume"].astype(np.int32)
+    return df
+
+
+def _history_column_values(column: pd.Series) -> List[Any]:
+    """Convert one history column to a list of JSON-serializable Python values"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.map(lambda ts: ts.isoformat()).tolist()
+    return column.tolist()
+
+
+@lru_cache(maxsize=4)
+def _market_status(time_bucket: int) -> Dict[str, Any]:
+    """Market status for one 30-second bucket; the answer only moves at minute granularity"""
+    # Simple market hours check (EST/EDT)
+    now = datetime.now()
+    
+    # Market is open Mon-Fri 9:30 AM - 4:00 PM EST
+    is_open = now.weekday() < 5 and 9 <= now.hour < 16
+    
+    return {
+        "is_open": is_open,
+        "current_time": now.isoformat(),
+        "next_open": "9:30 AM EST" if not is_open else None,
+        "next_close": "4:00 PM EST" if is_open else None
+    }
+
+
+@lru_cache(maxsize=256)
+def _search_symbol_indices(query_lower: str) -> Tuple[int, ...]:
+    """Indices into ALL_SYMBOLS whose symbol or name contains the query"""
+    if len(query_lower) < 2:
+        candidates = range(len(ALL_SYMBOLS_LC))
+    else:
+        # Narrow to entries sharing every bigram of the query, then confirm
+        bigram_sets = [BIGRAM_INDEX.get(query_lower[i:i + 2], set()) for i in range(len(query_lower) - 1)]
+        candidates = sorted(set.intersection(*bigram_sets))
+    
+    return tuple(
+        i for i in candidates
+        if query_lower in ALL_SYMBOLS_LC[i][1] or query_lower in ALL_SYMBOLS_LC[i][2]
+    )
+
 class YahooFinanceService:
-    def __init__(self):
+    def __init__(self) -> None:
         # Rate limiting: 30 requests per minute (Yahoo's approximate limit)
         self.rate_limit = 30
         self.time_window = 60  # seconds
-        self.request_times = []
-        self.request_lock = threading.Lock()
-        
-        # Request deduplication
-        self.pending_requests = {}
-        self.request_results = {}
+        # Sliding window counter: request counts for the current and previous window
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._prev_window_count = 0
+        # Guards only the window counters; never held while sleeping
+        self._rate_lock = threading.Lock()
         
-        # Multi-layer caching
-        self.price_cache = {}  # Short TTL for prices
-        self.info_cache = {}   # Longer TTL for company info
-        self.historical_cache = {}  # Long TTL for historical data
+        # Request deduplication: one Future per in-flight key
+        self.pending_requests: Dict[str, Future] = {}
         
         # Cache TTLs
         self.price_cache_ttl = 30  # 30 seconds for real-time prices
         self.info_cache_ttl = 300  # 5 minutes for company info
         self.historical_cache_ttl = 600  # 10 minutes for historical data
         
+        # Multi-layer caching: size-capped TTL caches, shared across worker threads
+        self.price_cache = TTLCache(maxsize=512, ttl=self.price_cache_ttl)  # Short TTL for prices
+        self.info_cache = TTLCache(maxsize=512, ttl=self.info_cache_ttl)   # Longer TTL for company info
+        self.historical_cache = TTLCache(maxsize=256, ttl=self.historical_cache_ttl)  # Long TTL for historical data
+        self._cache_lock = threading.Lock()
+        # Disk mirror of the caches above, so a restart or crash starts warm
+        self._disk = diskcache.Cache(os.path.join(settings.YAHOO_CACHE_DIR, "quotes"),
+                                     size_limit=256 * 1024 * 1024)
+        
+        # Price monitoring: symbol -> config, polled together by one background task
+        self.monitored_symbols: Dict[str, Dict[str, Any]] = {}
+        self.monitored_prices: Dict[str, Dict[str, Any]] = {}
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._monitor_stop: Optional[asyncio.Event] = None
+        
+        # Concurrent per-symbol fetches allowed in the async fan-out paths
+        self.max_concurrent_fetches = 10
+        # Symbols per batched yf.download call
+        self.batch_chunk_size = 20
+        
         # Fallback service
         self.fallback_service = yahoo_finance_fallback
+        self.fallback_service.rate_limiter = self._wait_for_rate_limit
+        self._session = self.fallback_service.session
         
         logger.info("YahooFinanceService initialized with rate limiting and fallback support")
     
-    def _wait_for_rate_limit(self):
-        """Implement rate limiting with sliding window"""
-        with self.request_lock:
-            current_time = time.time()
-            # Remove requests older than time window
-            self.request_times = [t for t in self.request_times if current_time - t < self.time_window]
-            
-            # Check if we're at the limit
-            if len(self.request_times) >= self.rate_limit:
-                # Calculate how long to wait
-                oldest_request = self.request_times[0]
-                wait_time = self.time_window - (current_time - oldest_request) + 0.1
-                if wait_time > 0:
-                    logger.warning(f"Rate limit reached. Waiting {wait_time:.2f} seconds")
-                    time.sleep(wait_time)
-                    # Recursive call to recheck
-                    return self._wait_for_rate_limit()
-            
-            # Add current request time
-            self.request_times.append(current_time)
+    def _wait_for_rate_limit(self) -> None:
+        """Implement rate limiting with a sliding window counter"""
+        while True:
+            with self._rate_lock:
+                current_time = time.monotonic()
+                elapsed = current_time - self._window_start
+                if elapsed >= self.time_window:
+                    # Roll the window; after a gap of 2+ windows the previous count is stale too
+                    windows_passed = int(elapsed // self.time_window)
+                    self._prev_window_count = self._window_count if windows_passed == 1 else 0
+                    self._window_count = 0
+                    self._window_start += windows_passed * self.time_window
+                    elapsed = current_time - self._window_start
+                
+                # Estimate requests in the trailing window by weighting the previous bucket
+                remaining = 1 - elapsed / self.time_window
+                if self._prev_window_count * remaining + self._window_count < self.rate_limit:
+                    self._window_count += 1
+                    return
+                
+                # At the limit, wait until the previous bucket's weight has decayed enough
+                if self._prev_window_count and self._window_count < self.rate_limit:
+                    needed_remaining = (self.rate_limit - self._window_count) / self._prev_window_count
+                    wait_time = (remaining - needed_remaining) * self.time_window + 0.1
+                else:
+                    wait_time = self.time_window - elapsed + 0.1
             
-            # Ensure minimum interval between requests
-            if len(self.request_times) > 1:
-                time_since_last = current_time - self.request_times[-2]
-                if time_since_last < 1.0:  # Minimum 1 second between requests
-                    sleep_time = 1.0 - time_since_last
-                    time.sleep(sleep_time)
-    
-    def _get_from_cache(self, cache_dict: Dict, key: str, ttl: int) -> Optional[Any]:
-        """Get value from cache if not expired"""
-        if key in cache_dict:
-            value, timestamp = cache_dict[key]
-            if time.time() - timestamp < ttl:
-                return value
-            else:
-                # Clean up expired entry
-                del cache_dict[key]
-        return None
+            # Sleep outside the lock so other threads aren't serialized behind us
+            logger.warning(f"Rate limit reached. Waiting {wait_time:.2f} seconds")
+            time.sleep(wait_time)
+    
+    def _get_cached(self, cache: TTLCache, kind: str, key: str) -> Optional[Any]:
+        """Look up a cache entry, falling back to the disk mirror on a memory miss"""
+        with self._cache_lock:
+            value = cache.get(key)
+        if value is None:
+            value = self._disk.get((kind, key))
+            if value is not None:
+                with self._cache_lock:
+                    cache[key] = value
+        return value
     
-    def _set_cache(self, cache_dict: Dict, key: str, value: Any):
-        """Set value in cache with timestamp"""
-        cache_dict[key] = (value, time.time())
+    def _get_many(self, cache: TTLCache, keys: List[str]) -> Dict[str, Any]:
+        """Look up several memory cache entries with one lock and one clock read"""
+        found = {}
+        # Nesting the cache timer freezes its clock for every lookup inside
+        with self._cache_lock, cache.timer:
+            for key in keys:
+                value = cache.get(key)
+                if value is not None:
+                    found[key] = value
+        return found
     
-    def _deduplicate_request(self, key: str, request_func, *args, **kwargs):
+    def _set_cached(self, cache: TTLCache, kind: str, key: str, value: Any) -> None:
+        """Store a cache entry in memory and on disk with the same TTL"""
+        with self._cache_lock:
+            cache[key] = value
+        self._disk.set((kind, key), value, expire=cache.ttl)
+    
+    def _deduplicate_request(self, key: str, request_func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
         """Prevent duplicate concurrent requests for the same resource"""
-        with self.request_lock:
-            if key in self.pending_requests:
-                # Request already in progress, wait for it
-                logger.info(f"Request for {key} already in progress, waiting...")
-                event = self.pending_requests[key]
-            else:
-                # New request, create event
-                event = threading.Event()
-                self.pending_requests[key] = event
-                
-        if key in self.pending_requests and self.pending_requests[key] == event:
-            # We're the first request, execute it
-            try:
-                result = request_func(*args, **kwargs)
-                self.request_results[key] = ('success', result)
-            except Exception as e:
-                self.request_results[key] = ('error', e)
-            finally:
-                event.set()
-                # Cleanup after a delay
-                threading.Timer(5.0, self._cleanup_request, args=[key]).start()
-        else:
-            # Wait for the other request to complete
-            event.wait(timeout=30)
-            if key in self.request_results:
-                status, result = self.request_results[key]
-                if status == 'success':
-                    return result
-                else:
-                    raise result
-                    
-        status, result = self.request_results.get(key, ('error', Exception("Request failed")))
-        if status == 'success':
+        # dict.setdefault is atomic under the GIL, so whoever inserts first leads
+        new_future = Future()
+        future = self.pending_requests.setdefault(key, new_future)
+        
+        if future is not new_future:
+            # Request already in progress, wait for its result (or exception)
+            logger.info(f"Request for {key} already in progress, waiting...")
+            return future.result(timeout=30)
+            
+        # We're the first request, execute it
+        try:
+            result = request_func(*args, **kwargs)
+            future.set_result(result)
             return result
-        else:
-            raise result
-    
-    def _cleanup_request(self, key: str):
-        """Clean up request tracking data"""
-        with self.request_lock:
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            # Only the leader removes the key, so a plain pop can't drop a newer request
             self.pending_requests.pop(key, None)
-            self.request_results.pop(key, None)
     
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
         """Get stock information with caching, rate limiting, and fallback"""
         try:
             # Check price cache first
-            cached_data = self._get_from_cache(self.price_cache, symbol, self.price_cache_ttl)
+            cached_data = self._get_cached(self.price_cache, "price", symbol)
             if cached_data:
-                logger.info(f"Returning cached data for {symbol}")
+                logger.info("Returning cached data for %s", symbol)
                 return cached_data
             
             # Use deduplication for concurrent requests
-            def fetch_stock_data():
-                # Apply rate limiting
-                self._wait_for_rate_limit()
+            def fetch_stock_data() -> Dict[str, Any]:
+                # Apply rate limiting, unless the symbol is negatively cached and won't hit Yahoo
+                if not self.fallback_service.is_known_missing(symbol):
+                    self._wait_for_rate_limit()
                 
                 # Try to get data using fallback service
                 return self.fallback_service.get_stock_info_with_fallback(symbol)
@@ -151,7 +256,7 @@ class YahooFinanceService:
             data = self._deduplicate_request(f"stock_info_{symbol}", fetch_stock_data)
             
             # Cache the result
-            self._set_cache(self.price_cache, symbol, data)
+            self._set_cached(self.price_cache, "price", symbol, data)
             
             return data
             
@@ -167,67 +272,161 @@ class YahooFinanceService:
             return self.fallback_service.get_batch_quotes_optimized(symbols)
         except Exception as e:
             logger.error(f"Batch fetch failed: {e}")
-            # Fallback to individual requests
-            results = []
-            for symbol in symbols:
-                try:
-                    results.append(self.get_stock_info(symbol))
-                except Exception as symbol_error:
-                    logger.error(f"Failed to fetch {symbol}: {symbol_error}")
-                    results.append(self.fallback_service._get_mock_data(symbol))
+            # Fallback to cached quotes, chunked batch downloads, then individual requests for the gaps
+            batch = self._get_many(self.price_cache, symbols)
+            batch.update(self._fetch_batch([symbol for symbol in symbols if symbol not in batch]))
+            results: List[Optional[Dict[str, Any]]] = [None] * len(symbols)
+            now_iso = iso_now()
+            for i, symbol in enumerate(symbols):
+                data = batch.get(symbol)
+                if data is None:
+                    try:
+                        data = self.get_stock_info(symbol)
+                    except Exception as symbol_error:
+                        logger.error(f"Failed to fetch {symbol}: {symbol_error}")
+                        data = self.fallback_service._get_mock_data(symbol, now_iso)
+                results[i] = data
             return results
     
-    def get_stock_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> Optional[Dict[str, Any]]:
-        """Get historical stock data with caching"""
+    def _fetch_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes with one batched yf.download per chunk of symbols"""
+        results = {}
+        now_iso = iso_now()
+        for start in range(0, len(symbols), self.batch_chunk_size):
+            chunk = symbols[start:start + self.batch_chunk_size]
+            try:
+                self._wait_for_rate_limit()
+                df = yf.download(" ".join(chunk), period="2d", interval="1d",
+                                 group_by='ticker', threads=True, progress=False, session=self._session)
+            except Exception as e:
+                logger.warning(f"Batch download failed for {len(chunk)} symbols: {e}")
+                continue
+            
+            if df is None or df.empty:
+                continue
+            
+            for symbol in chunk:
+                # Multiple symbols return multi-level columns keyed by ticker
+                if hasattr(df.columns, 'levels') and symbol in df.columns.levels[0]:
+                    symbol_data = df[symbol]
+                elif len(chunk) == 1:
+                    symbol_data = df
+                else:
+                    continue
+                
+                closes = symbol_data['Close'].dropna()
+                if closes.empty:
+                    continue
+                
+                current_price = float(closes.iloc[-1])
+                previous_close = float(closes.iloc[-2]) if len(closes) > 1 else current_price
+                results[symbol] = {
+                    "symbol": symbol,
+                    "company_name": symbol,
+                    "current_price": round(current_price, 2),
+                    "previous_close": round(previous_close, 2),
+                    "price_change": round(current_price - previous_close, 2),
+                    "price_change_percent": round((current_price - previous_close) / previous_close * 100, 2) if previous_close > 0 else 0,
+                    "volume": int(symbol_data['Volume'].fillna(0).iloc[-1]) if 'Volume' in symbol_data else 0,
+                    "last_updated": now_iso
+                }
+        
+        for symbol, data in results.items():
+            self._set_cached(self.price_cache, "price", symbol, data)
+        return results
+    
+    async def _aget_stock_info(self, symbol: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Fetch one quote in a worker thread, bounded by the shared semaphore"""
+        async with semaphore:
+            return await asyncio.to_thread(self.get_stock_info, symbol)
+    
+    async def aget_multiple_stocks(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Get multiple stock quotes without blocking the event loop"""
+        try:
+            # Use optimized batch fetching from fallback service
+            return await asyncio.to_thread(self.fallback_service.get_batch_quotes_optimized, symbols)
+        except Exception as e:
+            logger.error(f"Batch fetch failed: {e}")
+            # Fallback to concurrent individual requests
+            semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+            return list(await asyncio.gather(*(self._aget_stock_info(symbol, semaphore) for symbol in symbols)))
+    
+    def _get_history_frame(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """Get compact historical bars, shared by the dict and JSON history views"""
         cache_key = f"{symbol}_{period}_{interval}"
         
         # Check cache first
-        cached_data = self._get_from_cache(self.historical_cache, cache_key, self.historical_cache_ttl)
-        if cached_data:
-            logger.info(f"Returning cached historical data for {symbol}")
-            return cached_data
+        cached_frame = self._get_cached(self.historical_cache, "history_frame", cache_key)
+        if cached_frame is not None:
+            logger.info("Returning cached historical data for %s", symbol)
+            return cached_frame
         
-        def fetch_history():
+        def fetch_history() -> pd.DataFrame:
             self._wait_for_rate_limit()
             
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period, interval=interval)
-                
-                if hist.empty:
-                    raise ValueError(f"No historical data available for {symbol}")
-                
-                # Convert to JSON-serializable format
-                history_data = {
-                    "symbol": symbol,
-                    "period": period,
-                    "interval": interval,
-                    "data": hist.reset_index().to_dict('records'),
-                    "last_updated": datetime.now().isoformat()
-                }
-                
-                # Ensure all values are JSON serializable
-                for record in history_data["data"]:
-                    for key, value in record.items():
-                        if hasattr(value, 'timestamp'):
-                            record[key] = value.isoformat()
-                        elif hasattr(value, 'item'):
-                            record[key] = float(value)
-                
-                return history_data
-                
-            except Exception as e:
-                logger.error(f"Failed to fetch history for {symbol}: {e}")
-                # Return mock historical data
-                return self._generate_mock_history(symbol, period, interval)
+            ticker = yf.Ticker(symbol, session=self._session)
+            hist = ticker.history(period=period, interval=interval)
+            
+            if hist.empty:
+                raise ValueError(f"No historical data available for {symbol}")
+            
+            return _compact_history(hist)
         
+        frame = self._deduplicate_request(cache_key, fetch_history)
+        self._set_cached(self.historical_cache, "history_frame", cache_key, frame)
+        return frame
+    
+    def get_stock_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> Optional[Dict[str, Any]]:
+        """Get historical stock data with caching"""
         try:
-            data = self._deduplicate_request(cache_key, fetch_history)
-            self._set_cache(self.historical_cache, cache_key, data)
-            return data
+            df = self._get_history_frame(symbol, period, interval)
         except Exception as e:
-            logger.error(f"Error in get_stock_history: {e}")
+            logger.error(f"Failed to fetch history for {symbol}: {e}")
+            # Return mock historical data
             return self._generate_mock_history(symbol, period, interval)
+        
+        # Convert to JSON-serializable format column-wise: timestamps to ISO
+        # strings, everything else to native Python values via tolist()
+        columns = list(df.columns)
+        values = [_history_column_values(df[column]) for column in columns]
+        
+        return {
+            "symbol": symbol,
+            "period": period,
+            "interval": interval,
+            "data": [dict(zip(columns, row)) for row in zip(*values)],
+            "last_updated": iso_now()
+        }
+    
+    def get_stock_history_json(self, symbol: str, period: str = "1mo", interval: str = "1d") -> bytes:
+        """Get historical bars as a JSON array in the HistoricalData shape, converted column-wise"""
+        try:
+            df = self._get_history_frame(symbol, period, interval)
+        except Exception as e:
+            logger.error(f"Failed to fetch history JSON for {symbol}: {e}")
+            mock = self._generate_mock_history(symbol, period, interval)
+            return orjson.dumps([
+                {
+                    "date": point["Date"],
+                    "open": point["Open"],
+                    "high": point["High"],
+                    "low": point["Low"],
+                    "close": point["Close"],
+                    "volume": point["Volume"]
+                }
+                for point in mock["data"]
+            ])
+        
+        # Index is Date or Datetime depending on interval; dates keep the isoformat()
+        # strings of the dict-based history, in the exchange's local time
+        dates, opens, highs, lows, closes = (
+            _history_column_values(df[column]) for column in (df.columns[0], "Open", "High", "Low", "Close")
+        )
+        volumes = df["Volume"].fillna(0).astype(np.int64).tolist()
+        return orjson.dumps([
+            {"date": date, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+            for date, open_, high, low, close, volume in zip(dates, opens, highs, lows, closes, volumes)
+        ])
     
     def _generate_mock_history(self, symbol: str, period: str, interval: str) -> Dict[str, Any]:
         """Generate mock historical data"""
@@ -235,60 +434,46 @@ class YahooFinanceService:
         current_info = self.get_stock_info(symbol)
         base_price = current_info.get('current_price', 100)
         
-        # Generate historical points
-        points = []
+        # Generate historical points as whole arrays
         num_points = 30 if period == "1mo" else 7
+        rng = np.random.default_rng(abs(hash(symbol)) & 0xFFFFFFFF)
+        idx = np.arange(num_points)
         
-        for i in range(num_points):
-            date = datetime.now() - timedelta(days=num_points-i)
-            # Add some realistic variation
-            variation = 1 + (i - num_points/2) * 0.002  # Gradual trend
-            daily_var = 1 + (hash(f"{symbol}{date.date()}") % 100 - 50) / 1000  # Daily randomness
-            price = base_price * variation * daily_var
-            
-            points.append({
-                "Date": date.isoformat(),
-                "Open": round(price * 0.995, 2),
-                "High": round(price * 1.01, 2),
-                "Low": round(price * 0.99, 2),
-                "Close": round(price, 2),
-                "Volume": abs(hash(f"{symbol}{date}")) % 10000000
-            })
+        # Gradual trend plus seeded daily randomness
+        variation = 1 + (idx - num_points / 2) * 0.002
+        daily_var = 1 + rng.integers(-50, 50, num_points) / 1000.0
+        price = base_price * variation * daily_var
+        volumes = rng.integers(0, 10000000, num_points).tolist()
+        
+        now = datetime.now()
+        dates = [(now - timedelta(days=num_points - i)).isoformat() for i in range(num_points)]
+        points = [
+            {"Date": date, "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}
+            for date, open_, high, low, close, volume in zip(
+                dates,
+                np.round(price * 0.995, 2).tolist(),
+                np.round(price * 1.01, 2).tolist(),
+                np.round(price * 0.99, 2).tolist(),
+                np.round(price, 2).tolist(),
+                volumes
+            )
+        ]
         
         return {
             "symbol": symbol,
             "period": period,
             "interval": interval,
             "data": points,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": iso_now(),
             "_is_mock": True
         }
     
     def search_symbols(self, query: str) -> List[Dict[str, str]]:
         """Search for stock symbols"""
         try:
-            # Simple mock search for common symbols
-            all_symbols = [
-                {"symbol": "AAPL", "name": "Apple Inc.", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "GOOGL", "name": "Alphabet Inc.", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "MSFT", "name": "Microsoft Corporation", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "AMZN", "name": "Amazon.com Inc.", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "TSLA", "name": "Tesla, Inc.", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "META", "name": "Meta Platforms Inc.", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "NVDA", "name": "NVIDIA Corporation", "type": "Stock", "exchange": "NASDAQ"},
-                {"symbol": "JPM", "name": "JPMorgan Chase & Co.", "type": "Stock", "exchange": "NYSE"},
-                {"symbol": "BAC", "name": "Bank of America Corp", "type": "Stock", "exchange": "NYSE"},
-                {"symbol": "WMT", "name": "Walmart Inc.", "type": "Stock", "exchange": "NYSE"},
-            ]
-            
-            # Filter based on query
-            query_lower = query.lower()
-            results = [
-                s for s in all_symbols 
-                if query_lower in s["symbol"].lower() or query_lower in s["name"].lower()
-            ]
-            
-            return results[:5]  # Limit to 5 results
+            # Simple mock search for common symbols, via the prebuilt bigram index
+            indices = _search_symbol_indices(query.lower())
+            return [dict(ALL_SYMBOLS[i]) for i in indices[:5]]  # Limit to 5 results
             
         except Exception as e:
             logger.error(f"Error searching symbols: {e}")
@@ -297,20 +482,8 @@ class YahooFinanceService:
     def get_market_status(self) -> Dict[str, Any]:
         """Get current market status"""
         try:
-            # Simple market hours check (EST/EDT)
-            now = datetime.now()
-            weekday = now.weekday()
-            hour = now.hour
-            
-            # Market is open Mon-Fri 9:30 AM - 4:00 PM EST
-            is_open = weekday < 5 and 9 <= hour < 16
-            
-            return {
-                "is_open": is_open,
-                "current_time": now.isoformat(),
-                "next_open": "9:30 AM EST" if not is_open else None,
-                "next_close": "4:00 PM EST" if is_open else None
-            }
+            # Copy so callers can't mutate the memoized result
+            return dict(_market_status(int(time.time() // 30)))
         except Exception as e:
             logger.error(f"Error getting market status: {e}")
             return {"is_open": False, "error": str(e)}
@@ -345,83 +518,265 @@ class YahooFinanceService:
             stock_info = self.get_stock_info(symbol)
             
             # Extract only price-related data
+            now_iso = iso_now()
             return {
                 "symbol": symbol,
                 "price": stock_info.get("current_price", 0),
                 "volume": stock_info.get("volume", 0),
-                "timestamp": stock_info.get("last_updated", datetime.now().isoformat()),
-                "trading_day": datetime.now().strftime("%Y-%m-%d")
+                "timestamp": stock_info.get("last_updated", now_iso),
+                "trading_day": now_iso[:10]
             }
         except Exception as e:
             logger.error(f"Error getting realtime price for {symbol}: {e}")
             # Return mock data
+            now_iso = iso_now()
             return {
                 "symbol": symbol,
                 "price": 100.0,
                 "volume": 1000000,
-                "timestamp": datetime.now().isoformat(),
-                "trading_day": datetime.now().strftime("%Y-%m-%d")
+                "timestamp": now_iso,
+                "trading_day": now_iso[:10]
+            }
+    
+    def get_realtime_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get real-time price data for several stocks in one batched request"""
+        results = {}
+        if not symbols:
+            return results
+        
+        try:
+            self._wait_for_rate_limit()
+            df = yf.download(symbols, period="1d", interval="1m",
+                             group_by='ticker', threads=True, progress=False, session=self._session)
+            
+            if df is not None and not df.empty:
+                for symbol in symbols:
+                    # Multiple symbols return multi-level columns keyed by ticker
+                    if hasattr(df.columns, 'levels') and symbol in df.columns.levels[0]:
+                        symbol_data = df[symbol]
+                    elif len(symbols) == 1:
+                        symbol_data = df
+                    else:
+                        continue
+                    
+                    closes = symbol_data['Close'].dropna()
+                    if closes.empty:
+                        continue
+                    
+                    last_bar = closes.index[-1]
+                    results[symbol] = {
+                        "symbol": symbol,
+                        "price": float(closes.iloc[-1]),
+                        "volume": int(symbol_data['Volume'].fillna(0).sum()) if 'Volume' in symbol_data else 0,
+                        "timestamp": last_bar.isoformat(),
+                        "trading_day": last_bar.strftime("%Y-%m-%d")
+                    }
+        except Exception as e:
+            logger.warning(f"Batch realtime price download failed: {e}")
+        
+        # Fill in anything the batch missed one symbol at a time
+        for symbol in symbols:
+            if symbol not in results:
+                results[symbol] = self.get_realtime_price(symbol)
+        
+        return results
+    
+    async def start_price_monitoring(self, symbol: str, interval_seconds: int = 60,
+                                     threshold_percent: float = 5.0,
+                                     callback: Optional[Callable[[Dict[str, Any]], Any]] = None) -> None:
+        """Register a symbol with the shared price monitoring loop"""
+        self.monitored_symbols[symbol] = {
+            "interval_seconds": interval_seconds,
+            "threshold_percent": threshold_percent,
+            "callback": callback,
+            "baseline_price": None
+        }
+        
+        # One task polls every monitored symbol, start it on first registration
+        if self._monitor_task is None or self._monitor_task.done():
+            # Created here so the event binds to the running loop
+            self._monitor_stop = asyncio.Event()
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+        else:
+            # Keep a still-running loop alive if it was just told to stop
+            self._monitor_stop.clear()
+        
+        logger.info(f"Started monitoring {symbol} every {interval_seconds}s (threshold {threshold_percent}%)")
+    
+    def stop_price_monitoring(self, symbol: str) -> None:
+        """Stop monitoring a symbol"""
+        self.monitored_symbols.pop(symbol, None)
+        self.monitored_prices.pop(symbol, None)
+        if not self.monitored_symbols and self._monitor_stop:
+            # Wake the loop so it exits instead of sleeping out its interval
+            self._monitor_stop.set()
+        logger.info(f"Stopped monitoring {symbol}")
+    
+    def stop_all_monitoring(self) -> None:
+        """Stop monitoring every symbol and end the polling task"""
+        self.monitored_symbols.clear()
+        self.monitored_prices.clear()
+        if self._monitor_stop:
+            self._monitor_stop.set()
+    
+    def get_monitored_symbols(self) -> List[str]:
+        """Get symbols currently being monitored"""
+        return list(self.monitored_symbols)
+    
+    def get_cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get the last polled price for a monitored symbol"""
+        return self.monitored_prices.get(symbol)
+    
+    async def _monitor_loop(self) -> None:
+        """Poll all monitored symbols with one batched request per tick"""
+        while self.monitored_symbols and not self._monitor_stop.is_set():
+            try:
+                # yfinance is blocking; run the batch off the event loop
+                prices = await asyncio.to_thread(self.get_realtime_prices, list(self.monitored_symbols))
+            except Exception as e:
+                logger.error(f"Price monitoring fetch failed: {e}")
+                prices = {}
+            
+            # Dispatch per-symbol checks once the batch has returned
+            for symbol, price_data in prices.items():
+                config = self.monitored_symbols.get(symbol)
+                if config is None:
+                    # Stopped while the batch was in flight
+                    continue
+                self.monitored_prices[symbol] = price_data
+                await self._check_price_alert(symbol, config, price_data)
+            
+            if not self.monitored_symbols:
+                break
+            interval = min(config["interval_seconds"] for config in self.monitored_symbols.values())
+            try:
+                await asyncio.wait_for(self._monitor_stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _check_price_alert(self, symbol: str, config: Dict[str, Any], price_data: Dict[str, Any]) -> None:
+        """Fire the symbol's callback when price moves past its threshold"""
+        price = price_data.get("price", 0)
+        baseline = config["baseline_price"]
+        if not baseline:
+            config["baseline_price"] = price
+            return
+        
+        change_percent = (price - baseline) / baseline * 100
+        if abs(change_percent) < config["threshold_percent"]:
+            return
+        
+        # Re-arm from the new price so one move alerts once
+        config["baseline_price"] = price
+        if config["callback"]:
+            try:
+                await config["callback"]({
+                    "symbol": symbol,
+                    "price": price,
+                    "previous_price": baseline,
+                    "change_percent": round(change_percent, 2),
+                    "threshold_percent": config["threshold_percent"],
+                    "timestamp": price_data.get("timestamp", iso_now())
+                })
+            except Exception as e:
+                logger.error(f"Monitoring callback failed for {symbol}: {e}")
+    
+    def _format_index_price(self, symbol: str, info: Any) -> Dict[str, Any]:
+        """Build an index entry from a quote, or mock data if the fetch failed"""
+        if isinstance(info, Exception):
+            logger.error(f"Failed to get index {symbol}: {info}")
+            # Provide mock data for indices
+            return {
+                "name": MARKET_INDICES[symbol],
+                "price": _MOCK_INDEX_PRICES[symbol],
+                "change": 0,
+                "change_percent": 0
             }
+        return {
+            "name": MARKET_INDICES[symbol],
+            "price": info.get("current_price", 0),
+            "change": info.get("price_change", 0),
+            "change_percent": info.get("price_change_percent", 0)
+        }
     
     def get_index_prices(self) -> Dict[str, Any]:
         """Get major market index prices"""
-        indices = {
-            "^GSPC": "S&P 500",
-            "^DJI": "Dow Jones",
-            "^IXIC": "NASDAQ",
-            "^VIX": "VIX"
-        }
+        # Indices are independent, fetch them all at once
+        futures = {symbol: _INDEX_POOL.submit(self.get_stock_info, symbol) for symbol in MARKET_INDICES}
         
         results = {}
-        for symbol, name in indices.items():
+        for symbol, future in futures.items():
             try:
-                info = self.get_stock_info(symbol)
-                results[symbol] = {
-                    "name": name,
-                    "price": info.get("current_price", 0),
-                    "change": info.get("price_change", 0),
-                    "change_percent": info.get("price_change_percent", 0)
-                }
+                info = future.result(timeout=10)
             except Exception as e:
-                logger.error(f"Failed to get index {symbol}: {e}")
-                # Provide mock data for indices
-                results[symbol] = {
-                    "name": name,
-                    "price": {"^GSPC": 5000, "^DJI": 38000, "^IXIC": 16000, "^VIX": 15}[symbol],
-                    "change": 0,
-                    "change_percent": 0
-                }
+                info = e
+            results[symbol] = self._format_index_price(symbol, info)
         
         return results
     
-    def get_market_indices_batch(self) -> List[Dict[str, Any]]:
-        """Get market indices data in batch format for API compatibility"""
-        indices_data = self.get_index_prices()
-        
-        # Convert dictionary to list format
-        results = []
-        for symbol, data in indices_data.items():
-            results.append({
+    async def aget_index_prices(self) -> Dict[str, Any]:
+        """Get major market index prices, fetching all indices concurrently"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        infos = await asyncio.gather(
+            *(self._aget_stock_info(symbol, semaphore) for symbol in MARKET_INDICES),
+            return_exceptions=True
+        )
+        return {
+            symbol: self._format_index_price(symbol, info)
+            for symbol, info in zip(MARKET_INDICES, infos)
+        }
+    
+    def _indices_to_list(self, indices_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert index prices to the list format used by the API"""
+        timestamp = iso_now()
+        return [
+            {
                 "symbol": symbol,
                 "name": data["name"],
                 "price": data["price"],
                 "change": data["change"],
                 "change_percent": data["change_percent"],
-                "timestamp": datetime.now().isoformat()
-            })
-        
-        return results
+                "timestamp": timestamp
+            }
+            for symbol, data in indices_data.items()
+        ]
     
-    def initialize(self):
+    def get_market_indices_batch(self) -> List[Dict[str, Any]]:
+        """Get market indices data in batch format for API compatibility"""
+        return self._indices_to_list(self.get_index_prices())
+    
+    async def aget_market_indices_batch(self) -> List[Dict[str, Any]]:
+        """Async variant of get_market_indices_batch"""
+        return self._indices_to_list(await self.aget_index_prices())
+    
+    def initialize(self) -> bool:
         """Initialize the service"""
         logger.info("YahooFinanceService with fallback initialized successfully")
-        # Load any cached data
-        self.fallback_service.load_cache_from_file()
         return True
     
-    def cleanup(self):
-        """Cleanup and save cache"""
-        self.fallback_service.save_cache_to_file()
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Entry counts and memo hit rates of this service's caches and the fallback's"""
+        with self._cache_lock:
+            stats: Dict[str, Any] = {
+                "price_cache_size": len(self.price_cache),
+                "info_cache_size": len(self.info_cache),
+                "historical_cache_size": len(self.historical_cache)
+            }
+        stats.update({
+            "disk_cache_size": len(self._disk),
+            "disk_cache_bytes": self._disk.volume(),
+            "pending_requests": len(self.pending_requests),
+            "search_memo": _search_symbol_indices.cache_info()._asdict(),
+            "market_status_memo": _market_status.cache_info()._asdict(),
+            "fallback": self.fallback_service.get_cache_stats()
+        })
+        return stats
+    
+    def cleanup(self) -> None:
+        """Stop monitoring and close the disk caches"""
+        self.stop_all_monitoring()
+        self._disk.close()
+        self.fallback_service.close()
         logger.info("YahooFinanceService cleanup completed")
 
 
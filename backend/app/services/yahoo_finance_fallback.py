@@ -3,25 +3,255 @@ Yahoo Finance Fallback Service
 Provides multiple data sources and robust fallback mechanisms
 """
 
+import os
 import yfinance as yf
-from typing import Dict, List, Optional, Any
+import requests
+import diskcache
+import orjson
+import numpy as np
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, List, NamedTuple, Optional, Any, Set, Tuple
 from datetime import datetime, timedelta
 import time
 import logging
 import random
+import threading
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Keep yfinance's own persistent timezone cache beside ours, so history/download
+# calls don't re-fetch each ticker's exchange timezone after a restart
+_YFINANCE_CACHE_DIR = os.path.join(settings.YAHOO_CACHE_DIR, "yfinance")
+os.makedirs(_YFINANCE_CACHE_DIR, exist_ok=True)
+yf.set_tz_cache_location(_YFINANCE_CACHE_DIR)
+
+# Worker threads for the per-symbol fallbacks of symbols a batch download missed
+_FALLBACK_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix="yf-fallback")
+
+# (epoch second, ISO string) of the last formatted timestamp
+_iso_second = (0, "")
+
+
+def iso_now() -> str:
+    """Current local time in ISO format, formatted at most once per second"""
+    global _iso_second
+    second = int(time.time())
+    if _iso_second[0] != second:
+        _iso_second = (second, datetime.fromtimestamp(second).isoformat())
+    return _iso_second[1]
+
+
+class _MockBase(NamedTuple):
+    """Hard-coded mock quote base for a well-known symbol"""
+    price: float
+    name: str
+    change: float
+
+
+# Mock data with realistic values (including indices)
+_MOCK_PRICES = {
+    'AAPL': _MockBase(195.89, 'Apple Inc.', 2.34),
+    'GOOGL': _MockBase(155.34, 'Alphabet Inc.', -1.23),
+    'MSFT': _MockBase(429.85, 'Microsoft Corporation', 3.45),
+    'TSLA': _MockBase(238.45, 'Tesla, Inc.', -5.67),
+    'AMZN': _MockBase(178.32, 'Amazon.com, Inc.', 1.89),
+    'META': _MockBase(520.48, 'Meta Platforms, Inc.', 4.32),
+    'NVDA': _MockBase(875.28, 'NVIDIA Corporation', 12.45),
+    'BRK.B': _MockBase(412.56, 'Berkshire Hathaway Inc.', -2.34),
+    'JPM': _MockBase(198.45, 'JPMorgan Chase & Co.', 1.23),
+    'JNJ': _MockBase(158.72, 'Johnson & Johnson', -0.89),
+    'V': _MockBase(284.13, 'Visa Inc.', 2.56),
+    'PG': _MockBase(167.89, 'Procter & Gamble Co.', 0.45),
+    'UNH': _MockBase(524.67, 'UnitedHealth Group Inc.', -3.21),
+    'HD': _MockBase(385.23, 'The Home Depot, Inc.', 2.89),
+    'MA': _MockBase(476.89, 'Mastercard Incorporated', 3.67),
+    'DIS': _MockBase(96.75, 'The Walt Disney Company', -1.45),
+    'BABA': _MockBase(83.45, 'Alibaba Group Holding Limited', 1.23),
+    'CHA': _MockBase(51.23, 'China Telecom Corp Ltd', -0.45),
+    'PDD': _MockBase(112.67, 'PDD Holdings Inc.', 4.56),
+    # Market indices
+    '^GSPC': _MockBase(5000.00, 'S&P 500', -45.23),
+    '^DJI': _MockBase(38000.00, 'Dow Jones Industrial Average', -234.56),
+    '^IXIC': _MockBase(16000.00, 'NASDAQ Composite', -123.45),
+    '^VIX': _MockBase(15.00, 'VIX Volatility Index', 0.34),
+}
+
+
+@lru_cache(maxsize=256)
+def _mock_base(symbol: str) -> Tuple[str, float, float, float]:
+    """(name, price, previous close, change %) for a mock symbol; unknown symbols keep their first draw"""
+    base = _MOCK_PRICES.get(symbol)
+    if base is None:
+        base = _MockBase(random.uniform(50, 500), f'{symbol} Corporation', random.uniform(-5, 5))
+    
+    previous_close = base.price - base.change
+    change_percent = (base.change / previous_close) * 100 if previous_close > 0 else 0
+    return base.name, base.price, previous_close, change_percent
+
+
+@lru_cache(maxsize=256)
+def _mock_template(symbol: str) -> Dict[str, Any]:
+    """Per-symbol mock quote with slow-moving fields drawn once; callers must copy it"""
+    name, price, previous_close, change_percent = _mock_base(symbol)
+    uniform = random.uniform
+    
+    return {
+        "symbol": symbol,
+        "company_name": name,
+        "current_price": round(price, 2),
+        "previous_close": round(previous_close, 2),
+        "open": round(previous_close * uniform(0.99, 1.01), 2),
+        "day_high": round(price * 1.01, 2),
+        "day_low": round(price * 0.99, 2),
+        "volume": random.randint(1000000, 50000000),
+        "market_cap": int(price * uniform(1e9, 1e12)),
+        "pe_ratio": round(uniform(10, 40), 2),
+        "dividend_yield": round(uniform(0, 0.05), 4),
+        "52_week_high": round(price * uniform(1.1, 1.5), 2),
+        "52_week_low": round(price * uniform(0.5, 0.9), 2),
+        "price_change": round(price - previous_close, 2),
+        "price_change_percent": round(change_percent, 2),
+        "last_updated": "",
+        "_is_mock": True
+    }
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Cached value with its monotonic expiry time"""
+    value: Any
+    expires: float
+
+
+# Slow-changing fast_info fields, read together only when the info cache misses
+_FAST_INFO_FIELDS = ('name', 'market_cap', 'currency', 'exchange')
+
+
+def _safe_float(value: Any, default: float = 0.0) -> float:
+    """Convert to float, falling back to a default for None or bad values"""
+    # Values that are already floats (the common case) skip the try/except
+    if type(value) is float:
+        return value
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _safe_int(value: Any, default: int = 0) -> int:
+    """Convert to int, falling back to a default for None or bad values"""
+    # Values that are already ints (the common case) skip the try/except
+    if type(value) is int:
+        return value
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _round2(values: np.ndarray) -> List[float]:
+    """Round each value to 2 places"""
+    return [round(value, 2) for value in values.tolist()]
+
+
+def _quote_arrays(closes: np.ndarray) -> Tuple[List[float], List[float], List[float], List[float], List[bool]]:
+    """Per-column (current, previous close, change, change %, has price) from a date x ticker close matrix"""
+    valid = ~np.isnan(closes)
+    # Number of valid closes at or after each row: 1 marks the latest, 2 the one before
+    rank_from_end = np.cumsum(valid[::-1], axis=0)[::-1]
+    current = np.where(valid & (rank_from_end == 1), closes, 0.0).sum(axis=0)
+    previous = np.where(valid & (rank_from_end == 2), closes, 0.0).sum(axis=0)
+    previous = np.where(valid.sum(axis=0) > 1, previous, current)
+    
+    change = current - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_percent = np.where(previous > 0, change / previous * 100, 0.0)
+    
+    # Python's round() on each value, as np.round can differ from it on ties like 12.345
+    return (
+        _round2(current),
+        _round2(previous),
+        _round2(change),
+        _round2(change_percent),
+        valid.any(axis=0).tolist()
+    )
+
+
+class _OrjsonDisk(diskcache.Disk):
+    """diskcache serializer storing quote dicts as orjson bytes instead of pickles"""
+    
+    def store(self, value, read, key=diskcache.core.UNKNOWN):
+        if not read:
+            value = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+        return super().store(value, read, key=key)
+    
+    def fetch(self, mode, filename, value, read):
+        data = super().fetch(mode, filename, value, read)
+        # Entries pickled before the switch still come back as dicts
+        if not read and isinstance(data, bytes):
+            data = orjson.loads(data)
+        return data
+
+
+def _build_yahoo_session() -> requests.Session:
+    """Pooled keep-alive session shared by every yfinance call"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class YahooFinanceFallbackService:
     """Enhanced Yahoo Finance service with multiple fallback options"""
     
     def __init__(self):
         self.mock_data_enabled = True
         self.last_successful_data = {}
-        self.permanent_cache = {}
+        # Last good quote per symbol, written through to disk so it survives restarts and crashes
+        self.permanent_cache = diskcache.Cache(os.path.join(settings.YAHOO_CACHE_DIR, "permanent"),
+                                               disk=_OrjsonDisk)
+        
+        # Reuse TCP/TLS connections (and Yahoo's cookies) across requests
+        self.session = _build_yahoo_session()
+        
+        # Slow-changing quote fields: symbol -> CacheEntry
+        self._info_cache: Dict[str, CacheEntry] = {}
+        self._previous_close_cache: Dict[str, CacheEntry] = {}
+        self.info_cache_ttl = 300  # 5 minutes for name/market cap/currency/exchange
+        self.previous_close_ttl = 3600  # previous close only changes once a day
+        
+        # Negative cache: symbols Yahoo had no price for -> monotonic expiry
+        self._missing_symbols: Dict[str, float] = {}
+        self._missing_lock = threading.Lock()  # pool workers mark symbols concurrently
+        self.negative_cache_ttl = 300  # symbols known to be invalid
+        self.failure_cache_ttl = 60  # errors and empty responses, which throttling also produces
+        self.max_missing_symbols = 1024
+        # Symbols whose last lookup came back without a price
+        self._empty_symbols: Set[str] = set()
+        
+        # Symbols per batched yf.download call
+        self.batch_chunk_size = 20
         
-    def get_stock_info_with_fallback(self, symbol: str) -> Dict[str, Any]:
+        # Called before each Yahoo request of the parallel fallbacks; YahooFinanceService
+        # installs its rate limiter here so the fan-out stays within its budget
+        self.rate_limiter: Optional[Callable[[], None]] = None
+        
+    def get_stock_info_with_fallback(self, symbol: str, now_iso: Optional[str] = None) -> Dict[str, Any]:
         """
         Get stock info with multiple fallback strategies
         
@@ -30,58 +260,71 @@ class YahooFinanceFallbackService:
         3. Use permanent cache
         4. Return mock data
         """
+        # Skip Yahoo for symbols it recently had no data for (delisted/invalid tickers)
+        if self.is_known_missing(symbol):
+            return self._get_offline_data(symbol, now_iso)
+        
         # Strategy 1: Try Yahoo Finance with minimal data
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             
             # Try to get basic info - wrapped in try/except for complete API failure
             try:
                 # Try fast_info first
                 fast_info = ticker.fast_info
                 
-                # Safe conversion with defaults
-                def safe_float(value, default=0.0):
-                    try:
-                        return float(value) if value is not None else default
-                    except (TypeError, ValueError):
-                        return default
-                
-                def safe_int(value, default=0):
-                    try:
-                        return int(value) if value is not None else default
-                    except (TypeError, ValueError):
-                        return default
-                
-                # Try to get any available data
-                current_price = None
-                
-                # Try different methods to get price
-                if hasattr(fast_info, 'last_price'):
-                    current_price = safe_float(getattr(fast_info, 'last_price', None))
+                # Try different methods to get price; fast_info properties are lazy,
+                # so read last_price once rather than probing it with hasattr first
+                current_price = _safe_float(getattr(fast_info, 'last_price', None))
                 
                 # If fast_info failed, try history
                 if not current_price or current_price == 0:
                     try:
                         hist = ticker.history(period="1d")
                         if not hist.empty and 'Close' in hist.columns:
-                            current_price = safe_float(hist['Close'].iloc[-1])
+                            current_price = _safe_float(hist['Close'].iloc[-1])
                     except:
                         pass
                 
                 # Skip if we don't have valid price data
                 if not current_price or current_price == 0:
+                    self._mark_no_price(symbol)
                     raise ValueError("No valid price data")
                 
+                # Each fast_info field can cost its own request, so reuse the
+                # slow-changing ones between polls
+                now = time.monotonic()
+                cached_info = self._info_cache.get(symbol)
+                if cached_info and cached_info.expires > now:
+                    info = cached_info.value
+                else:
+                    fields = {field: getattr(fast_info, field, None) for field in _FAST_INFO_FIELDS}
+                    info = {
+                        "company_name": fields['name'] or symbol,
+                        "market_cap": _safe_float(fields['market_cap']),
+                        "currency": fields['currency'] or 'USD',
+                        "exchange": fields['exchange'] or 'NASDAQ'
+                    }
+                    self._info_cache[symbol] = CacheEntry(info, now + self.info_cache_ttl)
+                
+                cached_close = self._previous_close_cache.get(symbol)
+                if cached_close and cached_close.expires > now:
+                    previous_close = cached_close.value
+                else:
+                    previous_close = _safe_float(getattr(fast_info, 'previous_close', current_price))
+                    if previous_close > 0:
+                        self._previous_close_cache[symbol] = CacheEntry(previous_close, now + self.previous_close_ttl)
+                
                 data = {
                     "symbol": symbol,
-                    "company_name": getattr(fast_info, 'name', symbol) or symbol,
+                    "company_name": info["company_name"],
                     "current_price": current_price,
-                    "previous_close": safe_float(getattr(fast_info, 'previous_close', current_price)),
-                    "market_cap": safe_float(getattr(fast_info, 'market_cap', 0)),
-                    "volume": safe_int(getattr(fast_info, 'last_volume', 0)),
-                    "currency": getattr(fast_info, 'currency', 'USD') or 'USD',
-                    "exchange": getattr(fast_info, 'exchange', 'NASDAQ') or 'NASDAQ',
-                    "last_updated": datetime.now().isoformat()
+                    "previous_close": previous_close,
+                    "market_cap": info["market_cap"],
+                    "volume": _safe_int(getattr(fast_info, 'last_volume', 0)),
+                    "currency": info["currency"],
+                    "exchange": info["exchange"],
+                    "last_updated": now_iso or iso_now()
                 }
                 
                 # Calculate changes
@@ -104,6 +347,8 @@ class YahooFinanceFallbackService:
                 })
                 
                 # Save successful data
+                with self._missing_lock:
+                    self._empty_symbols.discard(symbol)
                 self.last_successful_data[symbol] = data.copy()
                 self.permanent_cache[symbol] = data.copy()
                 
@@ -116,7 +361,53 @@ class YahooFinanceFallbackService:
                 
         except Exception as e:
             logger.warning(f"Yahoo Finance completely failed for {symbol}: {str(e)}")
+            # Back off briefly from symbols that errored for any other reason
+            self._mark_missing(symbol, self.failure_cache_ttl, replace=False)
         
+        return self._get_offline_data(symbol, now_iso)
+    
+    def is_known_missing(self, symbol: str) -> bool:
+        """Whether Yahoo recently returned no price data for the symbol"""
+        with self._missing_lock:
+            expires = self._missing_symbols.get(symbol)
+            if expires is None:
+                return False
+            if expires > time.monotonic():
+                return True
+            self._missing_symbols.pop(symbol, None)
+            return False
+    
+    def _mark_missing(self, symbol: str, ttl: float, replace: bool = True):
+        """Negatively cache a symbol, purging expired entries once the map grows large"""
+        with self._missing_lock:
+            if not replace and symbol in self._missing_symbols:
+                return
+            now = time.monotonic()
+            if len(self._missing_symbols) >= self.max_missing_symbols:
+                self._missing_symbols = {s: expires for s, expires in self._missing_symbols.items() if expires > now}
+            self._missing_symbols[symbol] = now + ttl
+    
+    def _mark_no_price(self, symbol: str):
+        """Negatively cache a symbol Yahoo returned no price for"""
+        # A throttled or empty response looks the same, so the long TTL is kept for symbols
+        # that never had a price and came back empty twice in a row
+        with self._missing_lock:
+            repeated = symbol in self._empty_symbols
+            if len(self._empty_symbols) >= self.max_missing_symbols:
+                self._empty_symbols.clear()
+            self._empty_symbols.add(symbol)
+        invalid = repeated and symbol not in self.last_successful_data and symbol not in self.permanent_cache
+        self._mark_missing(symbol, self.negative_cache_ttl if invalid else self.failure_cache_ttl)
+    
+    def _rate_limited_fallback(self, symbol: str, now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Individual fallback that waits on the rate limiter when it will call Yahoo"""
+        if self.rate_limiter is not None and not self.is_known_missing(symbol):
+            self.rate_limiter()
+        return self.get_stock_info_with_fallback(symbol, now_iso)
+    
+    def _get_offline_data(self, symbol: str, now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Serve a quote without calling Yahoo (strategies 2-4)"""
+        now_iso = now_iso or iso_now()
         # Strategy 2: Use last successful data
         if symbol in self.last_successful_data:
             data = self.last_successful_data[symbol].copy()
@@ -126,85 +417,33 @@ class YahooFinanceFallbackService:
                 data["current_price"] *= (1 + variation)
                 data["price_change"] = data["current_price"] - data["previous_close"]
                 data["price_change_percent"] = (data["price_change"] / data["previous_close"]) * 100
-                data["last_updated"] = datetime.now().isoformat()
+                data["last_updated"] = now_iso
             logger.info(f"Using last successful data for {symbol}")
             return data
         
         # Strategy 3: Use permanent cache
         if symbol in self.permanent_cache:
             data = self.permanent_cache[symbol].copy()
-            data["last_updated"] = datetime.now().isoformat()
+            data["last_updated"] = now_iso
             logger.info(f"Using permanent cache for {symbol}")
             return data
         
         # Strategy 4: Return mock data
-        return self._get_mock_data(symbol)
+        return self._get_mock_data(symbol, now_iso)
     
-    def _get_mock_data(self, symbol: str) -> Dict[str, Any]:
+    def _get_mock_data(self, symbol: str, now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Generate realistic mock data for a symbol"""
-        # Mock data with realistic values (including indices)
-        mock_prices = {
-            'AAPL': {'price': 195.89, 'name': 'Apple Inc.', 'change': 2.34},
-            'GOOGL': {'price': 155.34, 'name': 'Alphabet Inc.', 'change': -1.23},
-            'MSFT': {'price': 429.85, 'name': 'Microsoft Corporation', 'change': 3.45},
-            'TSLA': {'price': 238.45, 'name': 'Tesla, Inc.', 'change': -5.67},
-            'AMZN': {'price': 178.32, 'name': 'Amazon.com, Inc.', 'change': 1.89},
-            'META': {'price': 520.48, 'name': 'Meta Platforms, Inc.', 'change': 4.32},
-            'NVDA': {'price': 875.28, 'name': 'NVIDIA Corporation', 'change': 12.45},
-            'BRK.B': {'price': 412.56, 'name': 'Berkshire Hathaway Inc.', 'change': -2.34},
-            'JPM': {'price': 198.45, 'name': 'JPMorgan Chase & Co.', 'change': 1.23},
-            'JNJ': {'price': 158.72, 'name': 'Johnson & Johnson', 'change': -0.89},
-            'V': {'price': 284.13, 'name': 'Visa Inc.', 'change': 2.56},
-            'PG': {'price': 167.89, 'name': 'Procter & Gamble Co.', 'change': 0.45},
-            'UNH': {'price': 524.67, 'name': 'UnitedHealth Group Inc.', 'change': -3.21},
-            'HD': {'price': 385.23, 'name': 'The Home Depot, Inc.', 'change': 2.89},
-            'MA': {'price': 476.89, 'name': 'Mastercard Incorporated', 'change': 3.67},
-            'DIS': {'price': 96.75, 'name': 'The Walt Disney Company', 'change': -1.45},
-            'BABA': {'price': 83.45, 'name': 'Alibaba Group Holding Limited', 'change': 1.23},
-            'CHA': {'price': 51.23, 'name': 'China Telecom Corp Ltd', 'change': -0.45},
-            'PDD': {'price': 112.67, 'name': 'PDD Holdings Inc.', 'change': 4.56},
-            # Market indices
-            '^GSPC': {'price': 5000.00, 'name': 'S&P 500', 'change': -45.23},
-            '^DJI': {'price': 38000.00, 'name': 'Dow Jones Industrial Average', 'change': -234.56},
-            '^IXIC': {'price': 16000.00, 'name': 'NASDAQ Composite', 'change': -123.45},
-            '^VIX': {'price': 15.00, 'name': 'VIX Volatility Index', 'change': 0.34},
-        }
-        
-        # Get base data or generate random
-        base_data = mock_prices.get(symbol, {
-            'price': random.uniform(50, 500),
-            'name': f'{symbol} Corporation',
-            'change': random.uniform(-5, 5)
-        })
-        
-        price = base_data['price']
-        change = base_data['change']
-        previous_close = price - change
-        change_percent = (change / previous_close) * 100 if previous_close > 0 else 0
-        
-        # Add some random intraday variation
-        variation = random.uniform(-0.005, 0.005)  # ±0.5% variation
-        current_price = price * (1 + variation)
+        # Copy the memoized template, then vary only the intraday fields
+        template = _mock_template(symbol)
+        mock_data = template.copy()
         
-        mock_data = {
-            "symbol": symbol,
-            "company_name": base_data['name'],
-            "current_price": round(current_price, 2),
-            "previous_close": round(previous_close, 2),
-            "open": round(previous_close * random.uniform(0.99, 1.01), 2),
-            "day_high": round(current_price * random.uniform(1.0, 1.02), 2),
-            "day_low": round(current_price * random.uniform(0.98, 1.0), 2),
-            "volume": random.randint(1000000, 50000000),
-            "market_cap": int(current_price * random.uniform(1e9, 1e12)),
-            "pe_ratio": round(random.uniform(10, 40), 2),
-            "dividend_yield": round(random.uniform(0, 0.05), 4),
-            "52_week_high": round(current_price * random.uniform(1.1, 1.5), 2),
-            "52_week_low": round(current_price * random.uniform(0.5, 0.9), 2),
-            "price_change": round(change, 2),
-            "price_change_percent": round(change_percent, 2),
-            "last_updated": datetime.now().isoformat(),
-            "_is_mock": True
-        }
+        # One draw drives the ±0.5% price variation and the high/low spread
+        r = random.random()
+        current_price = template["current_price"] * (1 + (r - 0.5) * 0.01)
+        mock_data["current_price"] = round(current_price, 2)
+        mock_data["day_high"] = round(current_price * (1 + 0.02 * r), 2)
+        mock_data["day_low"] = round(current_price * (1 - 0.02 * (1 - r)), 2)
+        mock_data["last_updated"] = now_iso or iso_now()
         
         logger.info(f"Generated mock data for {symbol}")
         return mock_data
@@ -212,95 +451,82 @@ class YahooFinanceFallbackService:
     def get_batch_quotes_optimized(self, symbols: List[str]) -> List[Dict[str, Any]]:
         """
         Get multiple stock quotes with optimization
-        Uses download() for batch requests when possible
+        Uses one download() per chunk of symbols, individual fallbacks for the rest
         """
-        results = []
+        fetched: Dict[str, Dict[str, Any]] = {}
+        # One timestamp stamps every quote in the batch, including fallbacks
+        now_iso = iso_now()
         
-        # Try batch download first (more efficient)
-        try:
-            # Only try batch download if we have a small number of symbols
-            # Large batches are more likely to fail completely
-            if len(symbols) <= 5:
-                try:
-                    # Download basic price data for all symbols at once
-                    df = yf.download(symbols, period="2d", interval="1d", 
-                                   group_by='ticker', auto_adjust=True, 
-                                   progress=False, threads=False)
-                    
-                    if df is not None and not df.empty:
-                        for symbol in symbols:
-                            try:
-                                if len(symbols) == 1:
-                                    # Single symbol returns flat structure
-                                    symbol_data = df
-                                else:
-                                    # Multiple symbols returns multi-level columns
-                                    if hasattr(df.columns, 'levels') and symbol in df.columns.levels[0]:
-                                        symbol_data = df[symbol]
-                                    else:
-                                        symbol_data = None
-                                
-                                if symbol_data is not None and 'Close' in symbol_data and not symbol_data['Close'].empty:
-                                    current_price = float(symbol_data['Close'].iloc[-1])
-                                    previous_close = float(symbol_data['Close'].iloc[-2]) if len(symbol_data) > 1 else current_price
-                                    
-                                    data = {
-                                        "symbol": symbol,
-                                        "company_name": f"{symbol}",
-                                        "current_price": round(current_price, 2),
-                                        "previous_close": round(previous_close, 2),
-                                        "price_change": round(current_price - previous_close, 2),
-                                        "price_change_percent": round(((current_price - previous_close) / previous_close * 100) if previous_close > 0 else 0, 2),
-                                        "volume": int(symbol_data['Volume'].iloc[-1]) if 'Volume' in symbol_data else 0,
-                                        "last_updated": datetime.now().isoformat()
-                                    }
-                                    
-                                    results.append(data)
-                                    self.last_successful_data[symbol] = data.copy()
-                                    continue
-                                    
-                            except Exception as e:
-                                logger.debug(f"Batch processing failed for {symbol}: {e}")
-                            
-                            # Fallback to individual fetch
-                            results.append(self.get_stock_info_with_fallback(symbol))
-                    else:
-                        raise ValueError("Batch download returned empty dataframe")
-                except Exception as batch_error:
-                    logger.warning(f"Batch download failed completely: {batch_error}")
-                    # Fall through to individual requests
-                    
-        except Exception as e:
-            logger.error(f"Batch download error: {e}")
-        
-        # If we don't have results for all symbols, use individual fallbacks
-        if len(results) < len(symbols):
-            fetched_symbols = {r['symbol'] for r in results}
-            for symbol in symbols:
-                if symbol not in fetched_symbols:
-                    results.append(self.get_stock_info_with_fallback(symbol))
+        # Negatively cached symbols would only waste batch slots
+        live_symbols = [symbol for symbol in symbols if not self.is_known_missing(symbol)]
+        for start in range(0, len(live_symbols), self.batch_chunk_size):
+            chunk = live_symbols[start:start + self.batch_chunk_size]
+            try:
+                # Download basic price data for the whole chunk at once
+                df = yf.download(" ".join(chunk), period="2d", interval="1d",
+                                 group_by='ticker', auto_adjust=True,
+                                 progress=False, threads=True, session=self.session)
+            except Exception as batch_error:
+                logger.warning(f"Batch download failed for {len(chunk)} symbols: {batch_error}")
+                continue
+            
+            if df is None or df.empty:
+                logger.warning(f"Batch download returned empty dataframe for {len(chunk)} symbols")
+                continue
+            
+            try:
+                if not hasattr(df.columns, 'levels'):
+                    # Single symbol returns flat structure; lift it to ticker-grouped columns
+                    df = pd.concat({chunk[0]: df}, axis=1)
+                
+                # Date x ticker matrices; the quote math runs once for the whole chunk
+                closes = df.xs('Close', axis=1, level=1)
+                volumes = df.xs('Volume', axis=1, level=1).fillna(0).iloc[-1] if 'Volume' in df.columns.levels[1] else None
+                current, previous, change, change_percent, has_price = _quote_arrays(closes.to_numpy(dtype=np.float64))
+            except Exception as e:
+                logger.debug(f"Batch processing failed for {len(chunk)} symbols: {e}")
+                continue
+            
+            for k, symbol in enumerate(closes.columns):
+                if not has_price[k]:
+                    continue
+                data = {
+                    "symbol": symbol,
+                    "company_name": f"{symbol}",
+                    "current_price": current[k],
+                    "previous_close": previous[k],
+                    "price_change": change[k],
+                    "price_change_percent": change_percent[k],
+                    "volume": int(volumes[symbol]) if volumes is not None else 0,
+                    "last_updated": now_iso
+                }
+                
+                fetched[symbol] = data
+                self.last_successful_data[symbol] = data.copy()
         
-        return results
+        # Anything the batches missed goes through the individual fallbacks, in parallel
+        missing = list(dict.fromkeys(symbol for symbol in symbols if symbol not in fetched))
+        if missing:
+            fallbacks = _FALLBACK_POOL.map(lambda symbol: self._rate_limited_fallback(symbol, now_iso), missing)
+            fetched.update(zip(missing, fallbacks))
+        return [fetched[symbol] for symbol in symbols]
     
-    def save_cache_to_file(self, filepath: str = "stock_cache.json"):
-        """Save permanent cache to file for persistence"""
-        import json
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(self.permanent_cache, f, indent=2)
-            logger.info(f"Saved cache to {filepath}")
-        except Exception as e:
-            logger.error(f"Failed to save cache: {e}")
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Entry counts of the fallback caches and hit rates of the mock memos"""
+        return {
+            "last_successful_size": len(self.last_successful_data),
+            "permanent_cache_size": len(self.permanent_cache),
+            "permanent_cache_bytes": self.permanent_cache.volume(),
+            "info_cache_size": len(self._info_cache),
+            "previous_close_cache_size": len(self._previous_close_cache),
+            "negative_cache_size": len(self._missing_symbols),
+            "mock_base": _mock_base.cache_info()._asdict(),
+            "mock_template": _mock_template.cache_info()._asdict()
+        }
     
-    def load_cache_from_file(self, filepath: str = "stock_cache.json"):
-        """Load permanent cache from file"""
-        import json
-        try:
-            with open(filepath, 'r') as f:
-                self.permanent_cache = json.load(f)
-            logger.info(f"Loaded cache from {filepath}")
-        except Exception as e:
-            logger.warning(f"Failed to load cache: {e}")
+    def close(self):
+        """Close the on-disk cache"""
+        self.permanent_cache.close()
 
 
 # Create singleton instance
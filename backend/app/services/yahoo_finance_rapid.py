@@ -5,12 +5,31 @@ Enhanced Yahoo Finance API with insider trading, options, and advanced analytics
 
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Any
+import functools
+import orjson
+from cachetools import TTLCache
+from typing import Awaitable, Callable, Dict, List, Optional, Any
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _cached_endpoint(endpoint: str):
+    """Serve repeat calls with the same arguments from the endpoint's TTL cache"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args):
+            cache = self._caches[endpoint]
+            result = cache.get(args)
+            if result is None:
+                result = await method(self, *args)
+                cache[args] = result
+            return result
+        return wrapper
+    return decorator
+
+
 class YahooFinanceRapidService:
     """Enhanced Yahoo Finance service using RapidAPI"""
     
@@ -22,20 +41,52 @@ class YahooFinanceRapidService:
             "x-rapidapi-key": self.api_key
         }
         self._client = None
+        # Caps in-flight RapidAPI requests across concurrent batch fan-outs
+        self.max_concurrent_requests = 20
+        self._request_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Response caches per endpoint, keyed by call arguments
+        self._caches: Dict[str, TTLCache] = {
+            "quote": TTLCache(maxsize=1024, ttl=30),
+            "statistics": TTLCache(maxsize=1024, ttl=24 * 3600),
+            "trending": TTLCache(maxsize=1, ttl=300),
+            "market_summary": TTLCache(maxsize=1, ttl=60)
+        }
     
     @property
     def client(self) -> httpx.AsyncClient:
         """Get or create HTTP client"""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            # One pooled HTTP/2 transport for the single RapidAPI host, so parallel
+            # requests multiplex over a kept-alive connection; the transport also
+            # retries failed connection attempts
+            transport = httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+            )
+            self._client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                headers=self.headers
+            )
         return self._client
     
+    async def _get(self, url: str) -> httpx.Response:
+        """GET a RapidAPI endpoint, bounded by the shared request semaphore"""
+        if self._request_semaphore is None:
+            # Created on first use so it binds to the running loop
+            self._request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        async with self._request_semaphore:
+            return await self.client.get(url)
+    
     async def close(self):
         """Close HTTP client"""
         if self._client:
             await self._client.aclose()
             self._client = None
     
+    @_cached_endpoint("quote")
     async def get_quote(self, symbol: str) -> Dict[str, Any]:
         """
         Get real-time quote data for a stock
@@ -47,12 +98,9 @@ class YahooFinanceRapidService:
             Detailed quote information
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/quote/{symbol}",
-                headers=self.headers
-            )
+            response = await self._get(f"{self.base_url}/quote/{symbol}")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Extract and format key metrics
             if data.get("body"):
@@ -85,6 +133,31 @@ class YahooFinanceRapidService:
             logger.error(f"Error fetching quote for {symbol}: {str(e)}")
             raise ValueError(f"Failed to fetch quote for symbol: {symbol}")
     
+    async def get_quotes_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get quotes for several stocks concurrently
+        
+        Args:
+            symbols: Stock ticker symbols
+            
+        Returns:
+            Quotes keyed by symbol; symbols that failed are omitted
+        """
+        return await self._gather_by_symbol(symbols, self.get_quote, "quote")
+    
+    async def _gather_by_symbol(self, symbols: List[str], fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+                                label: str) -> Dict[str, Dict[str, Any]]:
+        """Run one per-symbol coroutine for every symbol at once"""
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+        
+        batch = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch {label} for {symbol}: {result}")
+            else:
+                batch[symbol] = result
+        return batch
+    
     async def get_insider_trades(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get insider trading information
@@ -100,9 +173,9 @@ class YahooFinanceRapidService:
             if symbol:
                 url += f"?symbol={symbol}"
                 
-            response = await self.client.get(url, headers=self.headers)
+            response = await self._get(url)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             trades = []
             if data.get("body", {}).get("rows"):
@@ -138,12 +211,10 @@ class YahooFinanceRapidService:
             Options chain with calls and puts
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/options/{symbol}",
-                headers=self.headers
-            )
+            response = await self._get(f"{self.base_url}/options/{symbol}")
             response.raise_for_status()
-            data = response.json()
+            # Chains can run to thousands of contracts; decode the raw bytes with orjson
+            data = orjson.loads(response.content)
             
             if data.get("body"):
                 options = data["body"]
@@ -161,6 +232,7 @@ class YahooFinanceRapidService:
             logger.error(f"Error fetching options for {symbol}: {str(e)}")
             raise ValueError(f"Failed to fetch options for symbol: {symbol}")
     
+    @_cached_endpoint("trending")
     async def get_trending_tickers(self) -> List[Dict[str, Any]]:
         """
         Get trending stocks
@@ -169,12 +241,9 @@ class YahooFinanceRapidService:
             List of trending tickers with details
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/markets/trending",
-                headers=self.headers
-            )
+            response = await self._get(f"{self.base_url}/markets/trending")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             tickers = []
             if data.get("body"):
@@ -195,6 +264,7 @@ class YahooFinanceRapidService:
             logger.error(f"Error fetching trending tickers: {str(e)}")
             raise ValueError(f"Failed to fetch trending tickers: {str(e)}")
     
+    @_cached_endpoint("market_summary")
     async def get_market_summary(self) -> Dict[str, Any]:
         """
         Get overall market summary
@@ -203,12 +273,9 @@ class YahooFinanceRapidService:
             Market indices and summary data
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/markets/summary",
-                headers=self.headers
-            )
+            response = await self._get(f"{self.base_url}/markets/summary")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if data.get("body"):
                 return {
@@ -224,6 +291,7 @@ class YahooFinanceRapidService:
             logger.error(f"Error fetching market summary: {str(e)}")
             raise ValueError(f"Failed to fetch market summary: {str(e)}")
     
+    @_cached_endpoint("statistics")
     async def get_stock_statistics(self, symbol: str) -> Dict[str, Any]:
         """
         Get detailed stock statistics
@@ -235,12 +303,9 @@ class YahooFinanceRapidService:
             Comprehensive statistics
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/stock/{symbol}/statistics",
-                headers=self.headers
-            )
+            response = await self._get(f"{self.base_url}/stock/{symbol}/statistics")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if data.get("body"):
                 stats = data["body"]
@@ -312,9 +377,9 @@ class YahooFinanceRapidService:
     
     def _format_options(self, options_list: List[Dict]) -> List[Dict[str, Any]]:
         """Format options data"""
-        formatted = []
-        for option in options_list:
-            formatted.append({
+        # Chains run to thousands of contracts; build rows in a single comprehension
+        return [
+            {
                 "contract_symbol": option.get("contractSymbol"),
                 "strike": option.get("strike", 0),
                 "expiration": option.get("expiration"),
@@ -327,8 +392,9 @@ class YahooFinanceRapidService:
                 "open_interest": option.get("openInterest", 0),
                 "implied_volatility": option.get("impliedVolatility", 0),
                 "in_the_money": option.get("inTheMoney", False)
-            })
-        return formatted
+            }
+            for option in options_list
+        ]
 
 
 # Create singleton instance
@@ -0,0 +1,7 @@
+"""
+Shared test setup: keep the Yahoo Finance disk caches out of the real cache directory
+"""
+import os
+import tempfile
+
+os.environ.setdefault("YAHOO_CACHE_DIR", tempfile.mkdtemp(prefix="yf_cache_test_"))
@@ -0,0 +1,175 @@
+"""
+Tests for news relevance scoring and alerts in the news monitor
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.services.news_monitor import ALERT_RELEVANCE_THRESHOLD, NewsAlert, NewsArticle, NewsMonitor
+
+
+def make_monitor(*symbols: str) -> NewsMonitor:
+    monitor = NewsMonitor()
+    for symbol in symbols:
+        monitor.add_symbol_monitoring(symbol)
+    return monitor
+
+
+def symbol_query(monitor: NewsMonitor, symbol: str) -> str:
+    """The search query get_symbol_news sends for a symbol"""
+    queries = []
+
+    async def capture(query, **kwargs):
+        queries.append(query)
+        return []
+
+    monitor.search_news = capture
+    asyncio.run(monitor.get_symbol_news(symbol))
+    return queries[0]
+
+
+def make_article(title: str, description: str, minutes_old: int) -> NewsArticle:
+    published_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_old)
+    return NewsArticle(title=title, description=description, source="Test", url="", published_at=published_at)
+
+
+def test_symbol_query_reaches_high_severity():
+    monitor = make_monitor("AAPL")
+    query = symbol_query(monitor, "AAPL")
+    article = make_article(
+        "Apple unveils new iPhone as Tim Cook touts iOS features",
+        "Apple shares rise after the iPhone launch.",
+        minutes_old=20
+    )
+
+    article.relevance_score = monitor._calculate_relevance(article, query)
+    assert 0.85 < article.relevance_score <= 1.0
+    assert NewsAlert("AAPL", article, "").to_dict()["severity"] == "high"
+
+
+def test_symbol_query_score_range():
+    monitor = make_monitor("AAPL")
+    query = symbol_query(monitor, "AAPL")
+
+    # Fresh title-only mention alerts at medium severity
+    description = (
+        "Component makers across Asia adjusted their quarterly forecasts on Tuesday, citing softer "
+        "demand for consumer electronics and higher memory prices, while analysts expect margins "
+        "to recover later in the year as inventories normalize."
+    )
+    fresh_title = make_article("Apple supplier update", description, minutes_old=20)
+    assert ALERT_RELEVANCE_THRESHOLD < monitor._calculate_relevance(fresh_title, query) <= 0.85
+
+    # The same mention a day later stays below the alert threshold
+    old_title = make_article("Apple supplier update", description, minutes_old=24 * 60)
+    assert 0.5 <= monitor._calculate_relevance(old_title, query) <= ALERT_RELEVANCE_THRESHOLD
+
+    # Unrelated article scores only its recency
+    unrelated = make_article("Markets mixed", "Stocks drift.", minutes_old=20)
+    assert monitor._calculate_relevance(unrelated, query) == 0.2
+
+
+def test_scoring_is_deterministic():
+    monitor = make_monitor("AAPL", "MSFT")
+    query = symbol_query(monitor, "AAPL")
+    article = make_article("Apple and Microsoft shares rise", "Apple gains on iPhone demand.", minutes_old=90)
+
+    scores = {monitor._calculate_relevance(article, query) for _ in range(5)}
+    assert len(scores) == 1
+
+
+def test_symbol_extraction_memoized_per_article():
+    monitor = NewsMonitor()
+    articles = [
+        {"title": "Apple and Tesla rally", "description": "NVDA also gains."},
+        {"title": "Markets mixed", "description": "Stocks drift."}
+    ]
+    first = monitor._extract_symbols_batch(articles)
+    assert sorted(first[0]) == ["AAPL", "NVDA", "TSLA"]
+    assert first[1] == []
+    assert len(monitor._symbol_memo) == 2
+
+    # Repeated articles come from the memo; only new ones are scanned
+    monitor._symbol_memo["Markets mixed Stocks drift."] = ("SPY",)
+    second = monitor._extract_symbols_batch([articles[1], {"title": "Microsoft update", "description": ""}])
+    assert second == [["SPY"], ["MSFT"]]
+    assert len(monitor._symbol_memo) == 3
+
+
+def live_monitor(fetch) -> NewsMonitor:
+    """Monitor in live mode with no Redis, whose NewsAPI searches go through fetch"""
+    monitor = NewsMonitor()
+    monitor.live_mode = True
+    monitor._redis = None
+    monitor._fetch_search_results = fetch
+    return monitor
+
+
+def test_concurrent_searches_share_one_fetch():
+    calls = []
+    articles = [make_article("Apple update", "", minutes_old=5)]
+
+    async def fetch(cache_key, *args):
+        calls.append(cache_key)
+        await asyncio.sleep(0.01)
+        return articles
+
+    async def run():
+        monitor = live_monitor(fetch)
+        results = await asyncio.gather(*(monitor.search_news('"Apple"') for _ in range(3)))
+        return monitor, results
+
+    monitor, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == articles for result in results)
+    assert monitor._inflight == {}
+
+
+def test_follower_gets_empty_result_when_leader_fails():
+    async def fetch(*args):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("NewsAPI down")
+
+    async def run():
+        monitor = live_monitor(fetch)
+        return monitor, await asyncio.gather(
+            monitor.search_news('"Apple"'), monitor.search_news('"Apple"'), return_exceptions=True
+        )
+
+    monitor, (leader, follower) = asyncio.run(run())
+    assert isinstance(leader, RuntimeError)
+    assert follower == []
+    assert monitor._inflight == {}
+
+
+def test_follower_survives_leader_cancellation():
+    async def fetch(*args):
+        await asyncio.sleep(10)
+        return []
+
+    async def run():
+        monitor = live_monitor(fetch)
+        leader = asyncio.create_task(monitor.search_news('"Apple"'))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(monitor.search_news('"Apple"'))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return monitor, await follower
+
+    monitor, follower_result = asyncio.run(run())
+    assert follower_result == []
+    assert monitor._inflight == {}
+
+
+def test_alerts_skip_symbols_whose_search_fails():
+    monitor = make_monitor("AAPL", "MSFT")
+    article = make_article("Apple unveils new iPhone", "Apple shares rise after the iPhone launch.", minutes_old=5)
+    article.relevance_score = 0.95
+
+    async def get_symbol_news(symbol, top_k=None):
+        if symbol == "MSFT":
+            raise RuntimeError("NewsAPI down")
+        return [article]
+
+    monitor.get_symbol_news = get_symbol_news
+    alerts = asyncio.run(monitor.monitor_news_alerts())
+    assert [alert["symbol"] for alert in alerts] == ["AAPL"]
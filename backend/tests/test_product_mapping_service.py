@@ -0,0 +1,24 @@
+"""
+Tests for topic to HSBC product mapping
+"""
+from app.services.product_mapping_service import ProductMappingService
+
+
+def test_relevant_product_is_a_fresh_copy():
+    mapper = ProductMappingService()
+    product = mapper.get_relevant_product("Should I buy bitcoin?")
+    product["name"] = "changed"
+
+    assert mapper.get_relevant_product("Should I buy bitcoin?")["name"] != "changed"
+
+
+def test_overlapping_keywords_all_count():
+    mapper = ProductMappingService()
+    # "digital asset" and "asset allocation" overlap; with "portfolio", wealth has two hits
+    assert mapper._determine_category("Review my digital asset allocation portfolio") == "wealth"
+
+
+def test_keyword_spanning_topic_and_context():
+    mapper = ProductMappingService()
+    # Scored as the combined "topic context" text, so "digital" + "asset" still forms a keyword
+    assert mapper._determine_category("tell me about digital", "asset custody") == "crypto"
@@ -0,0 +1,84 @@
+"""
+Tests for prompt template rendering
+"""
+import json
+
+import pytest
+from cachetools import LRUCache
+
+from app.services.prompt_service import PromptService
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    tasks = tmp_path / "tasks"
+    tasks.mkdir()
+    (tasks / "portfolio.md").write_text(
+        "Profile: {{profile.name}}\nHoldings: {{holdings}}\nMeta: {{meta}}\nMissing: {{nope}}\n",
+        encoding="utf-8"
+    )
+    return PromptService(prompts_dir=str(tmp_path))
+
+
+def test_structured_values_render_like_json_dumps(prompts):
+    holdings = [{"symbol": "AAPL", "weight": 0.25}, {"symbol": "7203.T", "name": "トヨタ"}]
+    meta = {"currency": "€", "tiers": [1, 2.5, None, True], "nested": {"b": 1, "a": 2}}
+
+    rendered = prompts.render_template("portfolio", {"profile": {"name": "Zoë"}, "holdings": holdings, "meta": meta})
+
+    assert rendered == (
+        "Profile: Zoë\n"
+        f"Holdings: {json.dumps(holdings, ensure_ascii=False)}\n"
+        f"Meta: {json.dumps(meta, ensure_ascii=False)}\n"
+        "Missing: {{nope}}\n"
+    )
+
+
+def test_render_cache_reuses_renders_and_respects_key_order(prompts):
+    context = {"profile": {"name": "A"}, "holdings": [1, 2], "meta": {"b": 1, "a": 2}}
+    first = prompts.render_template("portfolio", context)
+    assert len(prompts._render_cache) == 1
+
+    # Equal context hits the cache
+    assert prompts.render_template("portfolio", dict(context)) == first
+    assert len(prompts._render_cache) == 1
+
+    # Same keys in another order render (and cache) separately
+    reordered = prompts.render_template("portfolio", {**context, "meta": {"a": 2, "b": 1}})
+    assert 'Meta: {"a": 2, "b": 1}' in reordered
+    assert len(prompts._render_cache) == 2
+
+    # Values equal across types (1 vs True) don't share an entry
+    assert "Holdings: [true, 2]" in prompts.render_template("portfolio", {**context, "holdings": [True, 2]})
+
+
+def test_unhashable_context_renders_without_caching(prompts):
+    rendered = prompts.render_template("portfolio", {"profile": {"name": {"A"}}, "holdings": [], "meta": {}})
+    assert rendered.startswith("Profile: {'A'}\n")
+    assert len(prompts._render_cache) == 0
+
+
+def test_render_cache_skips_rendering_and_evicts_least_recent(prompts, monkeypatch):
+    renders = []
+    render_tokens = prompts._render_tokens
+
+    def counting(template_name, context):
+        renders.append(context["profile"]["name"])
+        return render_tokens(template_name, context)
+
+    monkeypatch.setattr(prompts, "_render_tokens", counting)
+    prompts._render_cache = LRUCache(maxsize=2)
+
+    def render(name):
+        return prompts.render_template("portfolio", {"profile": {"name": name}, "holdings": [], "meta": {}})
+
+    render("A")
+    render("B")
+    assert render("A").startswith("Profile: A\n")
+    assert renders == ["A", "B"]
+
+    # At capacity the least recently used render (B) is dropped
+    render("C")
+    render("A")
+    render("B")
+    assert renders == ["A", "B", "C", "B"]
@@ -0,0 +1,130 @@
+"""
+Tests for allocation extraction and session updates in the session service
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.models.llm_models import MAX_CONTEXT_TURNS, SessionState
+from app.services.session_service import _UPDATE_SESSION_LUA, SessionService
+
+
+def extract(response: str):
+    """Run allocation extraction against an in-memory (unconnected) session"""
+    return asyncio.run(SessionService().extract_allocations_from_response("test", response))
+
+
+def test_baseline_phrases():
+    session = extract("I recommend a crypto allocation of 5% and keeping equity at 55.5%.")
+    assert session.last_crypto_pct == 5.0
+    assert session.last_stock_pct == 55.5
+
+
+def test_adjacent_allocations_stay_separate():
+    session = extract("Keep stocks 40% and bonds 60%.")
+    assert session.last_stock_pct == 40.0
+    assert session.last_crypto_pct is None
+
+    session = extract("crypto 5% stocks 60%")
+    assert session.last_crypto_pct == 5.0
+    assert session.last_stock_pct == 60.0
+
+
+def test_asset_word_does_not_swallow_next_allocation():
+    session = extract("Keep stocks at 60% and crypto at 5%.")
+    assert session.last_stock_pct == 60.0
+    assert session.last_crypto_pct == 5.0
+
+
+def test_each_asset_class_searched_on_its_own():
+    # As with the baseline per-class search, both asset words read the following figure
+    session = extract("Hold stocks and crypto at 5%.")
+    assert session.last_stock_pct == 5.0
+    assert session.last_crypto_pct == 5.0
+
+
+def test_allocations_go_through_update_allocation(monkeypatch):
+    calls = []
+    original = SessionState.update_allocation
+
+    def tracking(self, asset_type, percentage):
+        calls.append((asset_type, percentage))
+        original(self, asset_type, percentage)
+
+    monkeypatch.setattr(SessionState, "update_allocation", tracking)
+    before = datetime.utcnow()
+    session = extract("Crypto: 3%, stocks: 70%")
+
+    assert calls == [("crypto", 3.0), ("stocks", 70.0)]
+    assert session.updated_at >= before
+
+
+def test_no_allocation_leaves_fields_unset():
+    session = extract("Markets were mixed today.")
+    assert session.last_crypto_pct is None
+    assert session.last_stock_pct is None
+    assert session.risk_level == "medium"
+
+
+def test_risk_level_low_takes_precedence():
+    session = extract("A conservative plan avoids high risk assets.")
+    assert session.risk_level == "low"
+
+
+def connected_service():
+    """Session service backed by an in-process fake Redis that runs the Lua update script"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    service = SessionService()
+    service._redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    service._update_script = service._redis.register_script(_UPDATE_SESSION_LUA)
+    service._connected = True
+    return service
+
+
+def test_lua_update_applies_fields_to_stored_session(caplog):
+    async def run():
+        service = connected_service()
+        await service.save_session(SessionState(session_id="s1", user_id="u1", risk_level="high"))
+        session = await service.extract_allocations_from_response("s1", "Hold stocks at 60% and crypto at 5%.")
+        stored = await service.get_or_create_session("s1")
+        ttl = await service._redis.ttl("session:s1")
+        return session, stored, ttl
+
+    session, stored, ttl = asyncio.run(run())
+    for state in (session, stored):
+        assert state.user_id == "u1"
+        assert state.risk_level == "high"
+        assert state.last_stock_pct == 60.0
+        assert state.last_crypto_pct == 5.0
+    assert 0 < ttl <= 3600
+    # Applied by the script, not the get/mutate/save fallback
+    assert "Session update script error" not in caplog.text
+
+
+def test_lua_update_creates_missing_session(caplog):
+    async def run():
+        service = connected_service()
+        await service.update_session_context("new", "hi", "hello")
+        return await service.get_or_create_session("new")
+
+    stored = asyncio.run(run())
+    assert stored.session_id == "new"
+    assert [turn["user"] for turn in stored.conversation_context] == ["hi"]
+    assert "Session update script error" not in caplog.text
+
+
+def test_lua_update_keeps_last_turns(caplog):
+    async def run():
+        service = connected_service()
+        for i in range(MAX_CONTEXT_TURNS + 3):
+            session = await service.update_session_context("s1", f"question {i}", f"answer {i}")
+        return session, await service.get_or_create_session("s1")
+
+    session, stored = asyncio.run(run())
+    expected = [f"question {i}" for i in range(3, MAX_CONTEXT_TURNS + 3)]
+    for state in (session, stored):
+        assert [turn["user"] for turn in state.conversation_context] == expected
+        assert state.conversation_context.maxlen == MAX_CONTEXT_TURNS
+    assert "Session update script error" not in caplog.text
@@ -0,0 +1,56 @@
+"""
+Tests for the stock history JSON served by /stock/{symbol}/history
+"""
+from typing import List
+
+import numpy as np
+import orjson
+import pandas as pd
+from pydantic import TypeAdapter
+
+from app.api.stocks import HistoricalData
+from app.services import yahoo_finance
+from app.services.yahoo_finance import YahooFinanceService
+
+
+def make_history() -> pd.DataFrame:
+    """A daily yfinance history frame, indexed in the exchange's local time"""
+    index = pd.DatetimeIndex(
+        ["2024-03-01", "2024-03-04", "2024-03-05"], tz="America/New_York", name="Date"
+    )
+    return pd.DataFrame({
+        "Open": [612345.67, 180.12, 99.99],
+        "High": [615000.01, 182.5, 101.25],
+        "Low": [610000.5, 179.01, 98.76],
+        "Close": [613456.78, 181.37, 100.5],
+        "Volume": np.array([1200, 55000000, 0], dtype=np.int64),
+        "Dividends": [0.0, 0.0, 0.0],
+        "Stock Splits": [0.0, 0.0, 0.0]
+    }, index=index)
+
+
+def test_history_json_keeps_historical_data_shape(monkeypatch):
+    hist = make_history()
+
+    class FakeTicker:
+        def __init__(self, symbol, session=None):
+            pass
+
+        def history(self, period, interval):
+            return hist
+
+    monkeypatch.setattr(yahoo_finance.yf, "Ticker", FakeTicker)
+    service = YahooFinanceService()
+    service._wait_for_rate_limit = lambda: None
+
+    points = TypeAdapter(List[HistoricalData]).validate_python(
+        orjson.loads(service.get_stock_history_json("HISTJSON", "5d", "1d"))
+    )
+
+    # Same dates (local isoformat) and exact values as the baseline per-row conversion
+    expected = hist.reset_index()
+    assert [point.date for point in points] == [ts.isoformat() for ts in expected["Date"]]
+    assert [point.close for point in points] == expected["Close"].tolist()
+    assert [point.open for point in points] == expected["Open"].tolist()
+    assert [point.volume for point in points] == expected["Volume"].tolist()
+    assert points[0].date == "2024-03-01T00:00:00-05:00"
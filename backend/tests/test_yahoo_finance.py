@@ -0,0 +1,136 @@
+"""
+Tests for rate limiting and request deduplication in the Yahoo Finance service
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app.services import yahoo_finance
+from app.services.yahoo_finance import YahooFinanceService
+
+
+class FakeClock:
+    """Stands in for the time module; sleep() advances the clock instead of blocking"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 2))
+        self.now += seconds
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    """Service limited to 3 requests per 10 seconds on a fake clock"""
+    clock = FakeClock()
+    monkeypatch.setattr(yahoo_finance, "time", clock)
+    service = YahooFinanceService()
+    service.rate_limit = 3
+    service.time_window = 10
+    return service, clock
+
+
+def test_rate_limit_waits_for_next_window(limited):
+    service, clock = limited
+    for _ in range(3):
+        service._wait_for_rate_limit()
+    assert clock.sleeps == []
+
+    # The fourth request waits out the rest of the window
+    service._wait_for_rate_limit()
+    assert clock.sleeps == [10.1]
+
+
+def test_rate_limit_weights_previous_window(limited):
+    service, clock = limited
+    for _ in range(4):
+        service._wait_for_rate_limit()
+    clock.sleeps.clear()
+
+    # Early in the new window the previous bucket still counts almost fully,
+    # so the next request waits only until enough of it has decayed
+    service._wait_for_rate_limit()
+    assert clock.sleeps == [pytest.approx(3.33, abs=0.01)]
+    assert service._window_count == 2
+
+
+def test_rate_limit_resets_after_idle_gap(limited):
+    service, clock = limited
+    for _ in range(3):
+        service._wait_for_rate_limit()
+
+    # After two or more idle windows the old counts no longer apply
+    clock.now += 25
+    for _ in range(3):
+        service._wait_for_rate_limit()
+    assert clock.sleeps == []
+    assert service._prev_window_count == 0
+
+
+def run_concurrently(monkeypatch, service, key, func, callers=4):
+    """Call _deduplicate_request from several threads, returning once all followers wait on the leader"""
+    waiting = threading.Semaphore(0)
+
+    class TrackedFuture(Future):
+        def result(self, timeout=None):
+            waiting.release()
+            return super().result(timeout)
+
+    monkeypatch.setattr(yahoo_finance, "Future", TrackedFuture)
+    pool = ThreadPoolExecutor(max_workers=callers)
+    futures = [pool.submit(service._deduplicate_request, key, func) for _ in range(callers)]
+    for _ in range(callers - 1):
+        assert waiting.acquire(timeout=5)
+    pool.shutdown(wait=False)
+    return futures
+
+
+def test_deduplicate_runs_request_once(monkeypatch):
+    service = YahooFinanceService()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"symbol": "AAPL"}
+
+    futures = run_concurrently(monkeypatch, service, "stock_info_AAPL", fetch)
+    release.set()
+    results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert service.pending_requests == {}
+
+
+def test_deduplicate_shares_leader_exception(monkeypatch):
+    service = YahooFinanceService()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("Yahoo unavailable")
+
+    futures = run_concurrently(monkeypatch, service, "stock_info_AAPL", fetch)
+    release.set()
+    for future in futures:
+        with pytest.raises(RuntimeError, match="Yahoo unavailable"):
+            future.result(timeout=5)
+
+    assert len(calls) == 1
+    assert service.pending_requests == {}
+
+    # A later request starts afresh rather than reusing the failed Future
+    assert service._deduplicate_request("stock_info_AAPL", lambda: "ok") == "ok"
@@ -0,0 +1,106 @@
+"""
+Tests for the Yahoo Finance fallback service's negative cache
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import yahoo_finance_fallback
+from app.services.yahoo_finance_fallback import YahooFinanceFallbackService
+
+
+class FakeFastInfo:
+    def __init__(self, price):
+        self.last_price = price
+        self.previous_close = price
+        self.last_volume = 100
+        self.name = None
+        self.market_cap = None
+        self.currency = "USD"
+        self.exchange = "NASDAQ"
+
+
+@pytest.fixture
+def quotes(monkeypatch):
+    """Fallback service whose Yahoo prices come from the returned dict (0 = no price)"""
+    prices = {}
+
+    class FakeTicker:
+        def __init__(self, symbol, session=None):
+            self.fast_info = FakeFastInfo(prices.get(symbol, 0))
+
+        def history(self, period):
+            return pd.DataFrame()
+
+    monkeypatch.setattr(yahoo_finance_fallback.yf, "Ticker", FakeTicker)
+    service = YahooFinanceFallbackService()
+    return service, prices
+
+
+def missing_ttl(service, symbol):
+    return service._missing_symbols[symbol] - time.monotonic()
+
+
+def test_one_empty_response_backs_off_briefly(quotes):
+    service, prices = quotes
+    prices["EMPTY1"] = 0
+    service.get_stock_info_with_fallback("EMPTY1")
+    assert 0 < missing_ttl(service, "EMPTY1") <= service.failure_cache_ttl
+
+
+def test_repeated_empty_responses_mark_symbol_invalid(quotes):
+    service, prices = quotes
+    service.get_stock_info_with_fallback("NOSUCH1")
+    service._missing_symbols.clear()
+    service.get_stock_info_with_fallback("NOSUCH1")
+    assert missing_ttl(service, "NOSUCH1") > service.failure_cache_ttl
+
+
+def test_symbol_with_price_history_never_marked_invalid(quotes):
+    service, prices = quotes
+    prices["FLAKY1"] = 123.45
+    assert service.get_stock_info_with_fallback("FLAKY1")["current_price"] == 123.45
+
+    # Two throttled (empty) responses in a row still only back off briefly
+    prices["FLAKY1"] = 0
+    for _ in range(2):
+        service._missing_symbols.clear()
+        data = service.get_stock_info_with_fallback("FLAKY1")
+        assert data["current_price"] == pytest.approx(123.45, rel=0.011)  # last good data
+        assert missing_ttl(service, "FLAKY1") <= service.failure_cache_ttl
+
+
+def reference_quote(column):
+    """Per-ticker quote fields computed as the baseline did, from the ticker's non-NaN closes"""
+    closes = column[~np.isnan(column)]
+    if not len(closes):
+        return 0.0, 0.0, 0.0, 0.0, False
+    current = float(closes[-1])
+    previous = float(closes[-2]) if len(closes) > 1 else current
+    change = current - previous
+    change_percent = change / previous * 100 if previous > 0 else 0
+    return round(current, 2), round(previous, 2), round(change, 2), round(change_percent, 2), True
+
+
+def test_quote_arrays_match_per_column_computation():
+    nan = np.nan
+    closes = np.array([
+        [101.25, 50.0, nan, nan, 0.0, 10.0],
+        [102.5, nan, nan, 7.77, 3.0, 12.345],
+        [nan, 51.5, nan, nan, 4.5, 11.1],
+    ])
+    columns = list(zip(*yahoo_finance_fallback._quote_arrays(closes)))
+
+    for i, quote in enumerate(columns):
+        assert quote == pytest.approx(reference_quote(closes[:, i])), f"column {i}"
+
+
+def test_quote_arrays_random_matrix():
+    rng = np.random.default_rng(0)
+    closes = rng.uniform(1, 500, size=(4, 200))
+    closes[rng.random(closes.shape) < 0.3] = np.nan
+    columns = list(zip(*yahoo_finance_fallback._quote_arrays(closes)))
+
+    assert columns == [pytest.approx(reference_quote(closes[:, i])) for i in range(closes.shape[1])]